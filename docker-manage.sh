@@ -113,6 +113,12 @@ case "$1" in
             echo -e "${YELLOW}Restore cancelled.${NC}"
         fi
         ;;
+    rebuild-rollups)
+        check_docker
+        echo -e "${YELLOW}Recomputing DashBorges rollups from the transactions...${NC}"
+        docker-compose exec dashborges python -m src.dashborges.rollups rebuild
+        echo -e "${GREEN}Rollups rebuilt.${NC}"
+        ;;
     volumes)
         check_docker
         echo -e "${GREEN}DashBorges Volume Information:${NC}"
@@ -138,7 +144,7 @@ case "$1" in
     *)
         echo -e "DashBorges Docker Management Script"
         echo -e "---------------------------------"
-        echo -e "Usage: $0 {start|stop|restart|logs|rebuild|backup|restore|volumes|clean}"
+        echo -e "Usage: $0 {start|stop|restart|logs|rebuild|backup|restore|rebuild-rollups|volumes|clean}"
         echo -e ""
         echo -e "Commands:"
         echo -e "  start         Start DashBorges containers"
@@ -148,6 +154,7 @@ case "$1" in
         echo -e "  rebuild       Rebuild containers from scratch"
         echo -e "  backup        Create a comprehensive backup of all data"
         echo -e "  restore       Restore from a backup file"
+        echo -e "  rebuild-rollups  Recompute the summary rollups from the transactions"
         echo -e "  volumes       Show volume information and usage"
         echo -e "  clean         Remove all containers and volumes (DESTRUCTIVE)"
         exit 1
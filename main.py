@@ -1,8 +1,11 @@
 import uvicorn
 import socket
 import sys
+import os
 import argparse
-from src.dashborges.api import app
+
+# Import string for the app, so worker processes can load it themselves
+APP = "src.dashborges.api:app"
 
 
 def is_port_in_use(port):
@@ -11,14 +14,53 @@ def is_port_in_use(port):
         return s.connect_ex(("127.0.0.1", port)) == 0
 
 
+def write_port_file(port, path=".api_port"):
+    """Publish the port atomically so readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(port))
+    os.replace(tmp_path, path)
+
+
 if __name__ == "__main__":
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Run the DashBorges API server")
     parser.add_argument(
         "--port", type=int, default=8000, help="Port to run the server on"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("DASHBORGES_API_WORKERS", "1")),
+        help="Number of worker processes",
+    )
+    parser.add_argument(
+        "--loop",
+        choices=["auto", "asyncio", "uvloop"],
+        default="auto",
+        help="Event loop implementation (auto uses uvloop when installed)",
+    )
+    parser.add_argument(
+        "--http",
+        choices=["auto", "h11", "httptools"],
+        default="auto",
+        help="HTTP parser implementation (auto uses httptools when installed)",
+    )
+    parser.add_argument(
+        "--reload", action="store_true", help="Reload the server on code changes"
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=30,
+        help="Seconds to wait for in-flight requests on shutdown",
+    )
     args = parser.parse_args()
 
+    if args.reload and args.workers > 1:
+        print("ERROR: --reload can't be combined with more than one worker.")
+        sys.exit(1)
+
     port = args.port
 
     # If the specified port is in use, try the next 10 ports
@@ -36,10 +78,19 @@ if __name__ == "__main__":
     if port != args.port:
         print(f"Port {args.port} is in use. Using port {port} instead.")
 
-    print(f"API server running at: http://127.0.0.1:{port}")
+    print(f"API server running at: http://127.0.0.1:{port} ({args.workers} workers)")
 
-    # Store the port in a file for other processes to use
-    with open(".api_port", "w") as f:
-        f.write(str(port))
+    # Store the port in a file for other processes to use. Only this
+    # supervising process writes it; the workers never run this block.
+    write_port_file(port)
 
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        APP,
+        host="0.0.0.0",
+        port=port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        reload=args.reload,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
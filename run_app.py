@@ -1,3 +1,4 @@
+import os
 import subprocess
 import time
 import threading
@@ -5,25 +6,36 @@ import webbrowser
 import argparse
 
 
-def run_api_server():
+def run_api_server(workers=1, reload=False, timeout=10):
     """Run the FastAPI backend server."""
     print("Starting API server...")
 
+    # Drop a port file left by a previous run so we only read a fresh one
+    try:
+        os.remove(".api_port")
+    except FileNotFoundError:
+        pass
+
     # Start the API server, which will find a free port
+    command = ["python", "main.py", f"--workers={workers}"]
+    if reload:
+        command.append("--reload")
     api_process = subprocess.Popen(
-        ["python", "main.py"], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
     )
 
-    # Wait a moment for the server to start and write the port file
-    time.sleep(2)
-
-    # Try to read the port from the .api_port file
+    # Wait for the server to write the port file
     api_port = 8000  # Default port
-    try:
-        with open(".api_port", "r") as f:
-            api_port = int(f.read().strip())
-        print(f"API server running at: http://127.0.0.1:{api_port}")
-    except (FileNotFoundError, ValueError):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and api_process.poll() is None:
+        try:
+            with open(".api_port", "r") as f:
+                api_port = int(f.read().strip())
+            print(f"API server running at: http://127.0.0.1:{api_port}")
+            break
+        except (FileNotFoundError, ValueError):
+            time.sleep(0.1)
+    else:
         print("Warning: Couldn't determine API port, using default port 8000")
 
     return api_process, api_port
@@ -112,6 +124,12 @@ def main():
     parser.add_argument(
         "--no-browser", action="store_true", help="Don't open browser automatically"
     )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of API worker processes"
+    )
+    parser.add_argument(
+        "--reload", action="store_true", help="Reload the API server on code changes"
+    )
 
     args = parser.parse_args()
 
@@ -124,7 +142,7 @@ def main():
     try:
         # Start API server unless dashboard-only flag is set
         if not args.dashboard_only:
-            api_process, api_port = run_api_server()
+            api_process, api_port = run_api_server(args.workers, args.reload)
             threading.Thread(
                 target=log_output, args=(api_process, "API"), daemon=True
             ).start()
@@ -1,13 +1,137 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import (
+    FastAPI,
+    Body,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, insert, or_, select, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
-from datetime import date
+from typing import Any, Dict, List, Literal, Optional, Union
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, ValidationError
+from datetime import date, timedelta
+import base64
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
 import pandas as pd
 
-from .database import get_db, Transaction
+from .database import (
+    ASYNC_DB,
+    backup_scheduler,
+    current_data_version,
+    env_flag,
+    get_db,
+    get_session,
+    init_db,
+    months_changed_since,
+    next_data_version,
+    run_db,
+    utcnow,
+    DeletedTransaction,
+    Rollup,
+    SessionLocal,
+    SyncOperation,
+    Transaction,
+)
+from .result_cache import ResultCache
+from .rollups import apply_rollup_deltas, bucket_totals, range_totals
+from .write_queue import GroupCommitWriter
+from .export import (
+    EXPORT_COLUMNS,
+    ENCODERS,
+    MEDIA_TYPES,
+    encode_columnar,
+    gzip_stream,
+    negotiate_columnar,
+)
 
-app = FastAPI(title="DashBorges API")
+logger = logging.getLogger(__name__)
+
+# Session type handed out by get_session. The asyncio extension is only
+# imported when the async engine is enabled, as it needs greenlet.
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    DbSession = Union[Session, AsyncSession]
+else:
+    DbSession = Session
+
+# Optional single-writer group commit for the single-row write endpoints
+GROUP_COMMIT = env_flag("DASHBORGES_GROUP_COMMIT")
+GROUP_COMMIT_WINDOW_MS = float(os.environ.get("DASHBORGES_GROUP_COMMIT_WINDOW_MS", "5"))
+GROUP_COMMIT_MAX_BATCH = int(os.environ.get("DASHBORGES_GROUP_COMMIT_MAX_BATCH", "256"))
+
+write_queue = (
+    GroupCommitWriter(
+        SessionLocal,
+        window=GROUP_COMMIT_WINDOW_MS / 1000,
+        max_batch=GROUP_COMMIT_MAX_BATCH,
+    )
+    if GROUP_COMMIT
+    else None
+)
+
+# Aggregate results reused across requests until a write touches their dates
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("DASHBORGES_RESULT_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("DASHBORGES_RESULT_CACHE_TTL", "300")),
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Schema setup runs at startup rather than import time, under a lock, so
+    # several workers starting together don't race on it
+    await run_in_threadpool(init_db)
+    # Snapshots run on a daemon thread, never on the request path; with
+    # several workers only the first to lock the backup directory takes them
+    backups = backup_scheduler()
+    if backups is not None:
+        backups.start()
+    yield
+    if backups is not None:
+        backups.stop()
+    if write_queue is not None:
+        write_queue.close()
+
+
+app = FastAPI(title="DashBorges API", lifespan=lifespan)
+
+# Rows inserted per commit by the bulk upload endpoint
+BULK_CHUNK_SIZE = int(os.environ.get("DASHBORGES_BULK_CHUNK_SIZE", "5000"))
+
+# Cap on the per-row validation errors echoed back by bulk endpoints
+MAX_REPORTED_ERRORS = 100
+
+# Columns a CSV import must provide
+CSV_COLUMNS = ["date", "category", "description", "amount", "type"]
+
+# Columns written by the PostgreSQL COPY bulk path
+COPY_COLUMNS = ("date", "category", "description", "amount", "type", "version")
+
+# Columns offset-paged listings can be sorted by
+SORT_COLUMNS = ("date", "category", "description", "amount", "type", "id")
+
+# Most changed rows returned by the change feed before asking for a reload
+MAX_CHANGES = int(os.environ.get("DASHBORGES_MAX_CHANGES", "10000"))
+
+# Largest batch of offline operations accepted by one sync request
+SYNC_MAX_BATCH = int(os.environ.get("DASHBORGES_SYNC_MAX_BATCH", "1000"))
+
+# Days an idempotency key is remembered, far longer than any client retries
+SYNC_KEY_TTL_DAYS = int(os.environ.get("DASHBORGES_SYNC_KEY_TTL_DAYS", "30"))
 
 
 # Pydantic models for request/response
@@ -30,126 +154,891 @@ class TransactionResponse(TransactionBase):
         orm_mode = True
 
 
+class TransactionPage(BaseModel):
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+
+class TransactionChanges(BaseModel):
+    version: int
+    reset: bool = False
+    upserts: List[TransactionResponse] = []
+    deleted: List[int] = []
+
+
+class SyncOperationRequest(BaseModel):
+    key: str
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None
+    data: Optional[TransactionCreate] = None
+
+
+# Fields each kind of sync operation must carry
+SYNC_REQUIRED_FIELDS = {
+    "create": ("data",),
+    "update": ("id", "data"),
+    "delete": ("id",),
+}
+
+
+def _encode_cursor(transaction):
+    """Build an opaque keyset cursor pointing just after a transaction."""
+    payload = json.dumps([str(transaction.date), transaction.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    """Decode a keyset cursor into its (date, id) position."""
+    try:
+        cursor_date, cursor_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date.fromisoformat(cursor_date), int(cursor_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _apply_date_filters(query, start_date, end_date):
+    """Restrict a transactions query to an inclusive date range."""
+    if start_date:
+        query = query.filter(Transaction.date >= start_date)
+    if end_date:
+        query = query.filter(Transaction.date <= end_date)
+    return query
+
+
+def _apply_filters(query, start_date, end_date, category, type):
+    """Apply the standard transaction list filters to a query."""
+    query = _apply_date_filters(query, start_date, end_date)
+    if category:
+        query = query.filter(Transaction.category == category)
+    if type:
+        query = query.filter(Transaction.type == type.lower())
+    return query
+
+
+# Health endpoints
+@app.get("/health")
+def health():
+    """Liveness check that doesn't touch the database."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready(db: DbSession = Depends(get_session)):
+    """Readiness check that pings the database."""
+    try:
+        await run_db(db, lambda session: session.execute(text("SELECT 1")))
+    except SQLAlchemyError:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return {"status": "ready"}
+
+
+def _rollup_entry(transaction, sign):
+    """Rollup change for adding (sign 1) or removing (sign -1) a row."""
+    return (
+        transaction.date,
+        transaction.type,
+        transaction.category,
+        sign * transaction.amount,
+        sign,
+    )
+
+
+def _to_response(transaction):
+    """Detach an ORM row into its response model while the session is live."""
+    return TransactionResponse.model_validate(transaction, from_attributes=True)
+
+
+def _etag(version, request, variant=None):
+    """Entity tag for a read: the data version plus the normalized query.
+
+    ``variant`` distinguishes representations of the same query, such as a
+    negotiated columnar format.
+    """
+    key = json.dumps(
+        [version, request.url.path, sorted(request.query_params.multi_items()), variant]
+    )
+    return f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def _matches(if_none_match, etag):
+    """Whether an If-None-Match header names the current entity tag."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _conditional(db, if_none_match, request, variant, cached, fn, *args):
+    """Run a read only when the client's copy is stale.
+
+    Returns the entity tag with the result, or with None when the tag
+    matches If-None-Match and the read was skipped. A ``cached`` read goes
+    through the result cache at the version the tag was computed from.
+    """
+    version = current_data_version(db)
+    etag = _etag(version, request, variant)
+    if _matches(if_none_match, etag):
+        return etag, None
+    if cached:
+        return etag, _cached_aggregate(db, version, fn, *args)
+    return etag, fn(db, *args)
+
+
+async def _conditional_read(db, request, response, variant, fn, *args, cached=False):
+    """Serve a read with an ETag, or a bodiless 304 if nothing changed.
+
+    Every write bumps the data version, so the tag changes exactly when the
+    result could have.
+    """
+    etag, result = await run_db(
+        db,
+        _conditional,
+        request.headers.get("if-none-match"),
+        request,
+        variant,
+        cached,
+        fn,
+        *args,
+    )
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if result is None:
+        return Response(status_code=304, headers=headers)
+    if isinstance(result, Response):
+        result.headers.update(headers)
+    else:
+        response.headers.update(headers)
+    return result
+
+
+def _cached_aggregate(db, version, fn, start_date, end_date, *args):
+    """Serve an aggregate over a date range from the result cache.
+
+    ``version`` is the current data version. An entry computed before the
+    latest write is still served when no write since then touched a month
+    in its range; the check reads the database, so writes through other
+    workers invalidate it as well.
+    """
+    key = (fn.__name__, start_date, end_date, *args)
+    cached = result_cache.get(key)
+    if cached is not None:
+        cached_version, value = cached
+        if cached_version == version or not months_changed_since(
+            db, cached_version, start_date, end_date
+        ):
+            result_cache.revalidate(key, version)
+            return value
+
+    value = fn(db, start_date, end_date, *args)
+    result_cache.put(key, version, value)
+    return value
+
+
+def _commit_after(db, fn, *args):
+    """Run a mutation and commit it on its own."""
+    result = fn(db, *args)
+    db.commit()
+    return result
+
+
+async def _write(db, fn, *args):
+    """Apply a single-row mutation, through the group-commit writer if enabled.
+
+    Mutations flush but never commit; the commit belongs to the caller here,
+    either one per request or one per group.
+    """
+    if write_queue is not None:
+        return await write_queue.run(fn, *args)
+    return await run_db(db, _commit_after, fn, *args)
+
+
 # CRUD endpoints
 @app.post("/transactions/", response_model=TransactionResponse)
-def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db)):
+async def create_transaction(
+    transaction: TransactionCreate,
+    db: DbSession = Depends(get_session),
+):
+    return await _write(db, _create_transaction, transaction)
+
+
+def _create_transaction(db, transaction):
     db_transaction = Transaction(
         date=transaction.date,
         category=transaction.category,
         description=transaction.description,
         amount=transaction.amount,
         type=transaction.type.lower(),
+        version=next_data_version(db, [transaction.date]),
     )
     db.add(db_transaction)
-    db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
+    apply_rollup_deltas(db, [_rollup_entry(db_transaction, 1)])
+    db.flush()
+    return _to_response(db_transaction)
 
 
-@app.get("/transactions/", response_model=List[TransactionResponse])
-def read_transactions(
-    skip: int = 0,
-    limit: int = 100,
+@app.get(
+    "/transactions/",
+    response_model=Union[List[TransactionResponse], TransactionPage],
+)
+async def read_transactions(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     category: Optional[str] = None,
     type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    db: DbSession = Depends(get_session),
+):
+    """List transactions.
+
+    By default pages with skip/limit and returns a plain list. Passing
+    ``cursor`` (an empty value for the first page) switches to keyset
+    pagination ordered by (date, id), which returns the page together with
+    the ``next_cursor`` to request the following one.
+
+    skip/limit pages can be ordered with ``sort``, a column name with a
+    ``-`` prefix for descending order (e.g. ``-amount``); ties are broken by
+    id so pages never overlap.
+
+    Clients that accept ``application/vnd.apache.arrow.stream`` or
+    ``application/vnd.apache.parquet`` get the page as a columnar body built
+    straight from the result rows; the next cursor is then sent in the
+    ``X-Next-Cursor`` header.
+
+    Responses carry an ETag; a request whose If-None-Match still matches
+    gets a 304 without the query being run.
+    """
+    if sort is not None:
+        if cursor is not None:
+            raise HTTPException(
+                status_code=400, detail="sort can't be combined with cursor paging"
+            )
+        if sort.lstrip("-") not in SORT_COLUMNS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"sort must be one of {', '.join(SORT_COLUMNS)}",
+            )
+
+    columnar_format = negotiate_columnar(accept)
+    if columnar_format:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            columnar_format = None
+
+    return await _conditional_read(
+        db,
+        request,
+        response,
+        columnar_format,
+        _read_transactions,
+        skip,
+        limit,
+        start_date,
+        end_date,
+        category,
+        type,
+        cursor,
+        sort,
+        columnar_format,
+    )
+
+
+def _read_transactions(
+    db, skip, limit, start_date, end_date, category, type, cursor, sort, columnar_format
 ):
-    query = db.query(Transaction)
+    if columnar_format:
+        query = select(*(getattr(Transaction, column) for column in EXPORT_COLUMNS))
+    else:
+        query = db.query(Transaction)
 
     # Apply filters if provided
-    if start_date:
-        query = query.filter(Transaction.date >= start_date)
-    if end_date:
-        query = query.filter(Transaction.date <= end_date)
-    if category:
-        query = query.filter(Transaction.category == category)
-    if type:
-        query = query.filter(Transaction.type == type.lower())
+    query = _apply_filters(query, start_date, end_date, category, type)
+
+    if cursor is None:
+        if sort:
+            column = getattr(Transaction, sort.lstrip("-"))
+            if sort.startswith("-"):
+                query = query.order_by(column.desc(), Transaction.id.desc())
+            else:
+                query = query.order_by(column, Transaction.id)
+        query = query.offset(skip).limit(limit)
+    else:
+        # Keyset pagination: seek past the last (date, id) instead of offsetting
+        if cursor:
+            cursor_date, cursor_id = _decode_cursor(cursor)
+            query = query.filter(
+                or_(
+                    Transaction.date > cursor_date,
+                    and_(Transaction.date == cursor_date, Transaction.id > cursor_id),
+                )
+            )
+        query = query.order_by(Transaction.date, Transaction.id).limit(limit + 1)
+
+    transactions = db.execute(query).all() if columnar_format else query.all()
+
+    next_cursor = None
+    if cursor is not None and len(transactions) > limit:
+        transactions = transactions[:limit]
+        next_cursor = _encode_cursor(transactions[-1])
+
+    if columnar_format:
+        return Response(
+            content=encode_columnar(transactions, columnar_format),
+            media_type=MEDIA_TYPES[columnar_format],
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None,
+        )
+
+    items = [_to_response(t) for t in transactions]
+    if cursor is None:
+        return items
+    return TransactionPage(items=items, next_cursor=next_cursor)
+
 
-    transactions = query.offset(skip).limit(limit).all()
-    return transactions
+def _export_batches(start_date, end_date, category, type, batch_size):
+    """Stream matching rows from the database in batches of plain tuples."""
+    # The request-scoped session is closed before the body is streamed,
+    # so the export owns its own session for the lifetime of the generator.
+    db = SessionLocal()
+    try:
+        query = _apply_filters(
+            select(*(getattr(Transaction, column) for column in EXPORT_COLUMNS)),
+            start_date,
+            end_date,
+            category,
+            type,
+        ).order_by(Transaction.date, Transaction.id)
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+    finally:
+        db.close()
+
+
+@app.get("/transactions/export")
+def export_transactions(
+    format: str = "ndjson",
+    gzip: bool = False,
+    batch_size: int = 5000,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    type: Optional[str] = None,
+):
+    """Stream the (filtered) ledger as NDJSON, CSV or an Arrow IPC stream."""
+    if format not in ENCODERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format, expected one of: {', '.join(ENCODERS)}",
+        )
+    if format == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Arrow export requires pyarrow")
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive")
+
+    body = ENCODERS[format](
+        _export_batches(start_date, end_date, category, type, batch_size)
+    )
+    headers = {"Content-Disposition": f'attachment; filename="transactions.{format}"'}
+    if gzip:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format], headers=headers)
+
+
+@app.get("/transactions/changes", response_model=TransactionChanges)
+async def read_transaction_changes(
+    since: Optional[int] = None,
+    db: DbSession = Depends(get_session),
+):
+    """Return what changed after data version ``since``.
+
+    Rows created or updated since then come back in ``upserts`` and the ids
+    of deleted rows in ``deleted``, along with the current ``version`` to
+    pass as ``since`` next time. Without ``since`` only the version is
+    returned. ``reset`` asks the client to reload everything instead, when
+    ``since`` is ahead of the server or more than DASHBORGES_MAX_CHANGES
+    rows changed.
+    """
+    return await run_db(db, _read_transaction_changes, since)
+
+
+def _read_transaction_changes(db, since):
+    # Read the version first: rows committed after it are at most sent twice
+    version = current_data_version(db)
+    if since is None or since == version:
+        return TransactionChanges(version=version)
+    if since > version:
+        return TransactionChanges(version=version, reset=True)
+
+    upserts = (
+        db.query(Transaction)
+        .filter(Transaction.version > since)
+        .order_by(Transaction.version, Transaction.id)
+        .limit(MAX_CHANGES + 1)
+        .all()
+    )
+    if len(upserts) > MAX_CHANGES:
+        return TransactionChanges(version=version, reset=True)
+
+    deleted = (
+        db.execute(
+            select(DeletedTransaction.transaction_id)
+            .where(DeletedTransaction.version > since)
+            .limit(MAX_CHANGES + 1)
+        )
+        .scalars()
+        .all()
+    )
+    if len(upserts) + len(deleted) > MAX_CHANGES:
+        return TransactionChanges(version=version, reset=True)
+
+    return TransactionChanges(
+        version=version,
+        upserts=[_to_response(t) for t in upserts],
+        deleted=deleted,
+    )
 
 
 @app.get("/transactions/{transaction_id}", response_model=TransactionResponse)
-def read_transaction(transaction_id: int, db: Session = Depends(get_db)):
+async def read_transaction(
+    transaction_id: int, db: DbSession = Depends(get_session)
+):
+    return await run_db(db, _read_transaction, transaction_id)
+
+
+def _read_transaction(db, transaction_id):
     transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
     if transaction is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    return transaction
+    return _to_response(transaction)
 
 
 @app.put("/transactions/{transaction_id}", response_model=TransactionResponse)
-def update_transaction(
-    transaction_id: int, transaction: TransactionCreate, db: Session = Depends(get_db)
+async def update_transaction(
+    transaction_id: int,
+    transaction: TransactionCreate,
+    db: DbSession = Depends(get_session),
 ):
+    return await _write(db, _update_transaction, transaction_id, transaction)
+
+
+def _update_transaction(db, transaction_id, transaction):
     db_transaction = (
         db.query(Transaction).filter(Transaction.id == transaction_id).first()
     )
     if db_transaction is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
+    # The row leaves its old month and joins the new one
+    changed_dates = [db_transaction.date, transaction.date]
+    removed = _rollup_entry(db_transaction, -1)
+
     # Update transaction attributes
     db_transaction.date = transaction.date
     db_transaction.category = transaction.category
     db_transaction.description = transaction.description
     db_transaction.amount = transaction.amount
     db_transaction.type = transaction.type.lower()
+    db_transaction.version = next_data_version(db, changed_dates)
+    apply_rollup_deltas(db, [removed, _rollup_entry(db_transaction, 1)])
 
-    db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
+    db.flush()
+    return _to_response(db_transaction)
 
 
 @app.delete("/transactions/{transaction_id}")
-def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
+async def delete_transaction(
+    transaction_id: int, db: DbSession = Depends(get_session)
+):
+    return await _write(db, _delete_transaction, transaction_id)
+
+
+def _delete_transaction(db, transaction_id):
     transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
     if transaction is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
     db.delete(transaction)
-    db.commit()
+    # Leave a tombstone so change feed readers learn about the delete
+    version = next_data_version(db, [transaction.date])
+    db.merge(DeletedTransaction(transaction_id=transaction_id, version=version))
+    apply_rollup_deltas(db, [_rollup_entry(transaction, -1)])
+    db.flush()
     return {"message": "Transaction deleted successfully"}
 
 
+def _validate_rows(rows, offset=0):
+    """Validate raw transaction dicts, splitting them into rows and errors.
+
+    Accepted rows come back as plain dicts ready for a Core insert; rejected
+    ones are reported with their position in the original upload.
+    """
+    accepted = []
+    errors = []
+    for index, row in enumerate(rows, start=offset):
+        try:
+            transaction = TransactionCreate.model_validate(row)
+        except ValidationError as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        accepted.append(
+            {
+                "date": transaction.date,
+                "category": transaction.category,
+                "description": transaction.description,
+                "amount": transaction.amount,
+                "type": transaction.type.lower(),
+            }
+        )
+    return accepted, errors
+
+
+def _copy_rows(db, rows):
+    """Load rows into PostgreSQL with COPY, much faster than executemany."""
+    buffer = io.StringIO()
+    # COPY reads an unquoted empty field as NULL, so quote every text value
+    # to keep empty descriptions as empty strings
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for row in rows:
+        writer.writerow([row[column] for column in COPY_COLUMNS])
+    buffer.seek(0)
+
+    statement = (
+        f"COPY {Transaction.__tablename__} ({', '.join(COPY_COLUMNS)}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    cursor = db.connection().connection.cursor()
+    try:
+        if db.get_bind().dialect.driver == "psycopg2":
+            cursor.copy_expert(statement, buffer)
+        else:
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def _insert_rows(db, rows):
+    """Insert validated rows with the fastest path for the backend and commit.
+
+    PostgreSQL (psycopg2 or psycopg 3) gets COPY; other backends get a single
+    Core executemany. All rows share one new data version, and their rollups
+    are updated in the same transaction.
+    """
+    if rows:
+        version = next_data_version(db, [row["date"] for row in rows])
+        for row in rows:
+            row["version"] = version
+        dialect = db.get_bind().dialect
+        if dialect.name == "postgresql" and dialect.driver in ("psycopg2", "psycopg"):
+            _copy_rows(db, rows)
+        else:
+            db.execute(insert(Transaction), rows)
+        apply_rollup_deltas(
+            db,
+            [
+                (row["date"], row["type"], row["category"], row["amount"], 1)
+                for row in rows
+            ],
+        )
+    db.commit()
+
+
+# Bulk endpoints validate rows in Python, which is CPU-bound work, so they
+# stay sync and run on the threadpool with a sync session in either mode.
 @app.post("/transactions/bulk/")
 def bulk_upload_transactions(
-    transactions: List[TransactionCreate], db: Session = Depends(get_db)
+    transactions: List[Dict[str, Any]] = Body(...),
+    chunk_size: int = BULK_CHUNK_SIZE,
+    db: Session = Depends(get_db),
 ):
-    db_transactions = []
-    for transaction in transactions:
-        db_transaction = Transaction(
-            date=transaction.date,
-            category=transaction.category,
-            description=transaction.description,
-            amount=transaction.amount,
-            type=transaction.type.lower(),
+    """Insert many transactions, validating and committing chunk by chunk.
+
+    Invalid rows are skipped rather than failing the whole upload; the
+    response reports accepted and rejected counts for every chunk.
+    """
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive")
+
+    chunks = []
+    errors = []
+    created = 0
+    for start in range(0, len(transactions), chunk_size):
+        accepted, rejected = _validate_rows(
+            transactions[start : start + chunk_size], offset=start
+        )
+        _insert_rows(db, accepted)
+        created += len(accepted)
+        errors.extend(rejected)
+        chunks.append(
+            {
+                "chunk": len(chunks),
+                "accepted": len(accepted),
+                "rejected": len(rejected),
+            }
+        )
+
+    return {
+        "message": f"{created} transactions created successfully",
+        "created": created,
+        "rejected": len(errors),
+        "chunks": chunks,
+        "errors": errors[:MAX_REPORTED_ERRORS],
+    }
+
+
+def _validate_frame(chunk, offset=0):
+    """Vectorized validation of a CSV chunk.
+
+    Returns the valid rows as dicts ready for a Core insert, plus the errors
+    for rows whose date or amount can't be parsed or that miss a field.
+    Empty text fields are kept as empty strings, like the bulk endpoint does.
+    """
+    dates = pd.to_datetime(chunk["date"], errors="coerce")
+    amounts = pd.to_numeric(chunk["amount"], errors="coerce")
+    text = chunk[["category", "description", "type"]]
+    valid = dates.notna() & amounts.notna() & text.notna().all(axis=1)
+
+    errors = [
+        {"index": offset + int(position), "error": "Invalid or missing field"}
+        for position in (~valid).to_numpy().nonzero()[0]
+    ]
+    rows = pd.DataFrame(
+        {
+            "date": dates[valid].dt.date,
+            "category": text["category"][valid],
+            "description": text["description"][valid],
+            "amount": amounts[valid].astype(float),
+            "type": text["type"][valid].str.lower(),
+        }
+    ).to_dict("records")
+    return rows, errors
+
+
+@app.post("/transactions/import")
+def import_transactions(
+    file: UploadFile = File(...),
+    chunk_size: int = BULK_CHUNK_SIZE,
+    db: Session = Depends(get_db),
+):
+    """Import a CSV upload incrementally.
+
+    The upload is spooled to disk by the multipart parser and read back in
+    chunks of ``chunk_size`` rows, each validated and committed on its own,
+    so memory stays bounded by the chunk size rather than the file size.
+    """
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive")
+
+    try:
+        reader = pd.read_csv(
+            file.file,
+            usecols=CSV_COLUMNS,
+            dtype={"category": str, "description": str, "type": str},
+            # Text like "", "N/A" or "null" is data, not a missing value;
+            # unparseable dates and amounts are still caught by validation
+            keep_default_na=False,
+            chunksize=chunk_size,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"CSV must contain columns: {', '.join(CSV_COLUMNS)}",
+        )
+
+    chunks = []
+    errors = []
+    created = 0
+    offset = 0
+    try:
+        for chunk in reader:
+            rows, rejected = _validate_frame(chunk, offset=offset)
+            _insert_rows(db, rows)
+            offset += len(chunk)
+            created += len(rows)
+            errors.extend(rejected[: MAX_REPORTED_ERRORS - len(errors)])
+            chunks.append(
+                {
+                    "chunk": len(chunks),
+                    "accepted": len(rows),
+                    "rejected": len(rejected),
+                }
+            )
+            logger.info(
+                f"Import {file.filename}: chunk {len(chunks)} done, "
+                f"{offset} rows read, {created} created"
+            )
+    except (ValueError, pd.errors.ParserError) as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Malformed CSV after {offset} rows ({created} imported): {e}",
+        )
+
+    return {
+        "message": f"{created} transactions imported successfully",
+        "created": created,
+        "rejected": offset - created,
+        "rows_read": offset,
+        "chunks": chunks,
+        "errors": errors,
+    }
+
+
+def _apply_sync_operation(db, operation, known):
+    """Apply one offline operation and return its (status, transaction id).
+
+    ``known`` is the recorded outcome when the key was seen before. Updates
+    and deletes are then not applied again. A create is different: the key
+    names the client's local row, which may have been edited since it was
+    first sent, so its latest values overwrite the row it created.
+    """
+    if operation.op == "create":
+        if known is None:
+            return "applied", _create_transaction(db, operation.data).id
+        if known.status != "applied":
+            return known.status, known.transaction_id
+        try:
+            _update_transaction(db, known.transaction_id, operation.data)
+        except HTTPException:
+            # Deleted on the server since; the delete wins
+            return "conflict", known.transaction_id
+        return "applied", known.transaction_id
+
+    if known is not None:
+        return known.status, known.transaction_id
+
+    if operation.op == "update":
+        try:
+            return "applied", _update_transaction(db, operation.id, operation.data).id
+        except HTTPException:
+            return "conflict", operation.id
+
+    try:
+        _delete_transaction(db, operation.id)
+    except HTTPException:
+        pass  # Already gone, which is what the client asked for
+    return "applied", operation.id
+
+
+@app.post("/transactions/sync")
+def sync_transactions(
+    operations: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+):
+    """Apply a batch of operations recorded by a client while offline.
+
+    Every operation carries a client-generated idempotency key, so a batch
+    can be resent after a lost response without anything applying twice.
+    Operations run in order, each in its own SAVEPOINT, and the batch
+    commits once. Updates of rows deleted on the server are reported as
+    conflicts and skipped; otherwise the last write wins.
+    """
+    if len(operations) > SYNC_MAX_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {SYNC_MAX_BATCH} operations per sync request",
+        )
+
+    cutoff = utcnow() - timedelta(days=SYNC_KEY_TTL_DAYS)
+    db.execute(delete(SyncOperation).where(SyncOperation.created_at < cutoff))
+
+    keys = [op.get("key") for op in operations if isinstance(op.get("key"), str)]
+    known = {
+        record.key: record
+        for record in db.query(SyncOperation).filter(SyncOperation.key.in_(keys))
+    }
+
+    results = []
+    for index, raw in enumerate(operations):
+        try:
+            operation = SyncOperationRequest.model_validate(raw)
+        except ValidationError as e:
+            results.append({"index": index, "status": "invalid", "error": str(e)})
+            continue
+        missing = [
+            field
+            for field in SYNC_REQUIRED_FIELDS[operation.op]
+            if getattr(operation, field) is None
+        ]
+        if missing:
+            results.append(
+                {
+                    "index": index,
+                    "key": operation.key,
+                    "status": "invalid",
+                    "error": f"{operation.op} needs {' and '.join(missing)}",
+                }
+            )
+            continue
+
+        record = known.get(operation.key)
+        with db.begin_nested():
+            status, transaction_id = _apply_sync_operation(db, operation, record)
+            if record is None:
+                record = SyncOperation(
+                    key=operation.key,
+                    op=operation.op,
+                    transaction_id=transaction_id,
+                    status=status,
+                )
+                db.add(record)
+                known[operation.key] = record
+            db.flush()
+        results.append(
+            {
+                "index": index,
+                "key": operation.key,
+                "status": status,
+                "id": transaction_id,
+            }
         )
-        db.add(db_transaction)
-        db_transactions.append(db_transaction)
 
     db.commit()
-    return {"message": f"{len(db_transactions)} transactions created successfully"}
+    return {"results": results}
 
 
 # API endpoint to get summary statistics
 @app.get("/summary/")
-def get_summary(
+async def get_summary(
+    request: Request,
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
+    by_category: bool = False,
+    by_type: bool = False,
+    by_month: bool = False,
+    db: DbSession = Depends(get_session),
 ):
-    query = db.query(Transaction)
-    if start_date:
-        query = query.filter(Transaction.date >= start_date)
-    if end_date:
-        query = query.filter(Transaction.date <= end_date)
+    return await _conditional_read(
+        db,
+        request,
+        response,
+        None,
+        _get_summary,
+        start_date,
+        end_date,
+        by_category,
+        by_type,
+        by_month,
+        cached=True,
+    )
 
-    transactions = query.all()
 
-    # Convert to DataFrame for easier analysis
-    if not transactions:
+def _get_summary(db, start_date, end_date, by_category, by_type, by_month):
+    # Every breakdown derives from one pass over the (type, category) rollups
+    groups = range_totals(db, start_date, end_date, (Rollup.type, Rollup.category))
+    count = sum(n for _, _, _, n in groups)
+
+    if not count:
         return {
             "total_income": 0,
             "total_expenses": 0,
@@ -157,11 +1046,6 @@ def get_summary(
             "period": "No data",
         }
 
-    df = pd.DataFrame([t.to_dict() for t in transactions])
-    total_income = df[df["type"] == "income"]["amount"].sum()
-    total_expenses = df[df["type"] == "expense"]["amount"].sum()
-    balance = total_income - total_expenses
-
     period = "All time"
     if start_date and end_date:
         period = f"{start_date} to {end_date}"
@@ -170,9 +1054,148 @@ def get_summary(
     elif end_date:
         period = f"Until {end_date}"
 
-    return {
+    by_type_totals = {}
+    for t, _, total, n in groups:
+        type_total, type_count = by_type_totals.get(t, (0, 0))
+        by_type_totals[t] = (type_total + total, type_count + n)
+    total_income = by_type_totals.get("income", (0, 0))[0]
+    total_expenses = by_type_totals.get("expense", (0, 0))[0]
+
+    summary = {
         "total_income": total_income,
         "total_expenses": total_expenses,
-        "balance": balance,
+        "balance": total_income - total_expenses,
         "period": period,
+        "count": count,
     }
+
+    if by_type:
+        summary["by_type"] = [
+            {"type": t, "total": total, "count": n}
+            for t, (total, n) in by_type_totals.items()
+        ]
+
+    if by_category:
+        summary["by_category"] = [
+            {"category": c, "type": t, "total": total, "count": n}
+            for t, c, total, n in sorted(groups, key=lambda row: (row[1], row[0]))
+        ]
+
+    if by_month:
+        summary["by_month"] = _monthly_analytics(db, start_date, end_date)
+
+    return summary
+
+
+# Analytics endpoints return chart-ready aggregates, so the size of a
+# response follows the number of months, categories or days it covers
+# rather than the number of transactions.
+@app.get("/analytics/monthly")
+async def monthly_analytics(
+    request: Request,
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: DbSession = Depends(get_session),
+):
+    """Income, expenses and balance per month."""
+    return await _conditional_read(
+        db,
+        request,
+        response,
+        None,
+        _monthly_analytics,
+        start_date,
+        end_date,
+        cached=True,
+    )
+
+
+def _monthly_analytics(db, start_date, end_date):
+    months = {}
+    for month, t, total, _ in bucket_totals(
+        db, start_date, end_date, "month", (Rollup.type,)
+    ):
+        totals = months.setdefault(month.strftime("%Y-%m"), {"income": 0, "expense": 0})
+        totals[t] = totals.get(t, 0) + total
+    return [
+        {
+            "month": month,
+            "income": totals["income"],
+            "expenses": totals["expense"],
+            "balance": totals["income"] - totals["expense"],
+        }
+        for month, totals in months.items()
+    ]
+
+
+@app.get("/analytics/categories")
+async def category_analytics(
+    request: Request,
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    type: str = "expense",
+    db: DbSession = Depends(get_session),
+):
+    """Total and count per category for one transaction type, largest first."""
+    return await _conditional_read(
+        db,
+        request,
+        response,
+        None,
+        _category_analytics,
+        start_date,
+        end_date,
+        type.lower(),
+        cached=True,
+    )
+
+
+def _category_analytics(db, start_date, end_date, type):
+    rows = range_totals(db, start_date, end_date, (Rollup.category,), type)
+    rows = sorted(rows, key=lambda row: row[1], reverse=True)
+    return [{"category": c, "total": t, "count": n} for c, t, n in rows]
+
+
+@app.get("/analytics/balance-series")
+async def balance_series(
+    request: Request,
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: Literal["day", "week", "month", "year"] = "day",
+    db: DbSession = Depends(get_session),
+):
+    """Net amount per day (or week, month, year) and the running balance.
+
+    Buckets are labelled with their first day; those cut by the range only
+    count the days inside it.
+    """
+    return await _conditional_read(
+        db,
+        request,
+        response,
+        None,
+        _balance_series,
+        start_date,
+        end_date,
+        granularity,
+        cached=True,
+    )
+
+
+def _balance_series(db, start_date, end_date, granularity="day"):
+    series = []
+    balance = 0
+    for bucket, t, total, _ in bucket_totals(
+        db, start_date, end_date, granularity, (Rollup.type,)
+    ):
+        net = -total if t == "expense" else total
+        if series and series[-1]["date"] == bucket:
+            series[-1]["net"] += net
+        else:
+            series.append({"date": bucket, "net": net, "balance": balance})
+        balance += net
+        series[-1]["balance"] = balance
+    return series
@@ -1,11 +1,29 @@
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
+import calendar
+from collections import OrderedDict
 import os
-import json
+import io
 import logging
+import sqlite3
+import threading
+import time
+import uuid
 from pathlib import Path
 
+from backup import BACKUP_INTERVAL, BACKUP_RETENTION, BackupScheduler
+from local_store import LocalStore
+
+try:
+    import pyarrow as pa
+except ImportError:  # Columnar transfer is optional
+    pa = None
+
 # Set up logging with file output for container environments
 DATA_DIR = os.environ.get("DASHBORGES_DATA_DIR", "/app/data")
 LOGS_DIR = os.environ.get("DASHBORGES_LOGS_DIR", "/app/logs")
@@ -24,89 +42,351 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Number of rows requested per page when walking /transactions/
+PAGE_SIZE = int(os.environ.get("DASHBORGES_PAGE_SIZE", "1000"))
+
+# Rows per POST and retry policy for bulk uploads
+UPLOAD_CHUNK_SIZE = int(os.environ.get("DASHBORGES_UPLOAD_CHUNK_SIZE", "5000"))
+UPLOAD_RETRIES = 3
+UPLOAD_BACKOFF = 0.5
+
+# Fields a transaction edit can't leave empty
+REQUIRED_FIELDS = ("date", "category", "amount", "type")
+
+# Operations replayed per request when syncing offline changes
+SYNC_BATCH_SIZE = int(os.environ.get("DASHBORGES_SYNC_BATCH_SIZE", "1000"))
+
+# Client errors worth retrying a sync batch on, like server errors
+SYNC_RETRY_STATUSES = (408, 429)
+
+# HTTP connection pool, timeouts and retry policy
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
+HTTP_POOL_SIZE = int(os.environ.get("DASHBORGES_HTTP_POOL_SIZE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("DASHBORGES_HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.environ.get("DASHBORGES_HTTP_READ_TIMEOUT", "60"))
+HTTP_RETRIES = int(os.environ.get("DASHBORGES_HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.environ.get("DASHBORGES_HTTP_BACKOFF", "0.3"))
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Responses kept for revalidation with If-None-Match
+HTTP_CACHE_SIZE = int(os.environ.get("DASHBORGES_HTTP_CACHE_SIZE", "256"))
+
+
+def _create_session():
+    """Create a pooled keep-alive session with exponential-backoff retries.
+
+    Only idempotent methods are retried automatically; bulk POSTs have their
+    own per-chunk retry loop.
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _never_sent(error):
+    """Whether a failed request can't have reached the server.
+
+    Only then is it safe to resend a request that isn't idempotent.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or not error.args:
+        return False
+    return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+
+
+class ResponseCache:
+    """Small thread-safe LRU of GET responses that carry an ETag."""
+
+    def __init__(self, max_entries=HTTP_CACHE_SIZE):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path, params, headers):
+        return (
+            path,
+            tuple(sorted((params or {}).items())),
+            (headers or {}).get("Accept"),
+        )
+
+    def get(self, key):
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def put(self, key, response):
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+class CircuitBreaker:
+    """Track API availability and recover from outages in the background.
+
+    The breaker starts closed (API assumed available) so constructing a
+    client never blocks. A failure opens it; a daemon thread then re-probes
+    the API with exponential backoff, moving to half-open while a probe is
+    in flight and back to closed as soon as one succeeds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, probe, min_interval=1.0, max_interval=30.0, on_recover=None):
+        self._probe = probe
+        self._on_recover = on_recover
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._interval = min_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.state = self.CLOSED
+
+        threading.Thread(
+            target=self._run, name="dashborges-api-probe", daemon=True
+        ).start()
+
+    @property
+    def available(self):
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        with self._lock:
+            recovered = self.state != self.CLOSED
+            if recovered:
+                logger.info("API server is available")
+            self.state = self.CLOSED
+            self._interval = self._min_interval
+        if recovered and self._on_recover is not None:
+            self._on_recover()
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                logger.warning("API server is not available. Running in offline mode.")
+            self.state = self.OPEN
+        self._wake.set()
+
+    def _check(self):
+        """Run one probe, as the half-open trial when the breaker is open."""
+        with self._lock:
+            if self.state == self.OPEN:
+                self.state = self.HALF_OPEN
+        if self._probe():
+            self.record_success()
+        else:
+            self.record_failure()
+            with self._lock:
+                self._interval = min(self._interval * 2, self._max_interval)
+
+    def _run(self):
+        # Confirm the optimistic initial state, then sleep until tripped
+        self._check()
+        while True:
+            if self.available:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            time.sleep(self._interval)
+            self._check()
+
 
 class DashBorgesClient:
-    def __init__(self, base_url="http://127.0.0.1:8000"):
+    def __init__(self, base_url=DEFAULT_BASE_URL):
         self.base_url = base_url
-        self.is_api_available = self._check_api_available()
+        self.session = _create_session()
+        self.cache = ResponseCache()
 
         # Local storage for offline mode - use container data directory
         self.data_dir = Path(DATA_DIR)
-        self.data_file = self.data_dir / "local_transactions.json"
+        self.data_file = self.data_dir / "local_transactions.db"
+        self.legacy_data_file = self.data_dir / "local_transactions.json"
         self.backup_dir = self.data_dir / "backups"
 
         # Create local storage directory if it doesn't exist
-        if not self.is_api_available:
-            self._ensure_local_storage()
+        self._ensure_local_storage()
 
-    def _check_api_available(self):
-        """Check if the API is available."""
+        # Offline changes are pushed whenever the API comes back
+        self._sync_lock = threading.Lock()
+        self.breaker = CircuitBreaker(
+            self._probe_health, on_recover=self._sync_in_background
+        )
+        if self.local_store.pending_count():
+            self._sync_in_background()
+
+    @property
+    def is_api_available(self):
+        return self.breaker.available
+
+    @is_api_available.setter
+    def is_api_available(self, value):
+        if value:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _probe_health(self):
+        """Check the API's lightweight health endpoint."""
         try:
-            response = requests.get(f"{self.base_url}/transactions/", timeout=1)
-            is_available = response.status_code == 200
-            if is_available:
-                logger.info("API server is available")
-            return is_available
+            # Bypass the retrying session so an offline API is detected fast
+            response = requests.get(f"{self.base_url}/health", timeout=1)
+            return response.status_code == 200
         except requests.exceptions.RequestException as e:
-            logger.warning(
-                f"API server is not available: {e}. Running in offline mode."
-            )
+            logger.debug(f"API health probe failed: {e}")
             return False
 
+    def _request(self, method, path, **kwargs):
+        """Send a request through the pooled session with default timeouts."""
+        kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+        return self.session.request(method, f"{self.base_url}{path}", **kwargs)
+
+    def _get(self, path, params=None, headers=None):
+        """GET through the response cache.
+
+        A cached response is revalidated with If-None-Match; on 304 it is
+        returned as is, so an unchanged result costs one header round trip.
+        """
+        key = ResponseCache.key(path, params, headers)
+        cached = self.cache.get(key)
+        request_headers = dict(headers or {})
+        if cached is not None:
+            request_headers["If-None-Match"] = cached.headers["ETag"]
+
+        response = self._request("GET", path, params=params, headers=request_headers)
+        if response.status_code == 304 and cached is not None:
+            return cached
+        if response.status_code == 200 and "ETag" in response.headers:
+            self.cache.put(key, response)
+        return response
+
     def _ensure_local_storage(self):
-        """Ensure local storage directory and file exist."""
+        """Ensure the local storage directory and embedded store exist."""
         # Create directories if they don't exist
         os.makedirs(self.data_dir, exist_ok=True)
         os.makedirs(self.backup_dir, exist_ok=True)
 
-        # Create empty transactions file if it doesn't exist
-        if not self.data_file.exists():
-            with open(self.data_file, "w") as f:
-                json.dump([], f)
-            logger.info(f"Created local storage file: {self.data_file}")
-
-    def _load_local_transactions(self):
-        """Load transactions from local storage."""
-        try:
-            if self.data_file.exists():
-                with open(self.data_file, "r") as f:
-                    transactions = json.load(f)
-                logger.info(
-                    f"Loaded {len(transactions)} transactions from local storage"
-                )
-                return transactions
-            return []
-        except Exception as e:
-            logger.error(f"Error loading local transactions: {e}")
+        self.local_store = LocalStore(self.data_file)
+
+        # Carry over data kept by the old JSON-file storage
+        self.local_store.import_json(self.legacy_data_file)
+
+        self.backups = None
+        if BACKUP_INTERVAL > 0:
+            self.backups = BackupScheduler(
+                str(self.data_file),
+                str(self.backup_dir),
+                "transactions",
+                BACKUP_INTERVAL,
+                BACKUP_RETENTION,
+            ).start()
+
+    def _fetch_pages(self, params, page_size):
+        """Walk the keyset-paginated /transactions/ endpoint.
+
+        Pages are requested as Arrow IPC when pyarrow is installed, so each
+        page becomes a typed DataFrame without per-row parsing. Returns one
+        DataFrame per page.
+        """
+        headers = {"Accept": f"{ARROW_MEDIA_TYPE}, application/json"} if pa else {}
+        frames = []
+        cursor = ""
+        while cursor is not None:
+            response = self._get(
+                "/transactions/",
+                params={**params, "cursor": cursor, "limit": page_size},
+                headers=headers,
+            )
+            response.raise_for_status()
+            if response.headers.get("content-type", "").startswith(ARROW_MEDIA_TYPE):
+                table = pa.ipc.open_stream(io.BytesIO(response.content)).read_all()
+                frames.append(table.to_pandas(date_as_object=False))
+                cursor = response.headers.get("X-Next-Cursor")
+            else:
+                page = response.json()
+                frames.append(pd.DataFrame(page["items"]))
+                cursor = page["next_cursor"]
+        return frames
+
+    def _month_partitions(self, params, partitions):
+        """Split the requested date range into contiguous month groups.
+
+        Uses the server-side monthly summary to find which months hold data,
+        so that each group can be paged independently.
+        """
+        summary_params = {
+            key: params[key] for key in ("start_date", "end_date") if key in params
+        }
+        response = self._get("/summary/", params={**summary_params, "by_month": True})
+        response.raise_for_status()
+        months = [row["month"] for row in response.json().get("by_month", [])]
+        if not months:
             return []
 
-    def _save_local_transactions(self, transactions):
-        """Save transactions to local storage with backup."""
-        try:
-            # Create backup before saving new data
-            if self.data_file.exists():
-                backup_file = (
-                    self.backup_dir
-                    / f"transactions_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                )
-                os.makedirs(backup_file.parent, exist_ok=True)
-                with open(self.data_file, "r") as src, open(backup_file, "w") as dst:
-                    dst.write(src.read())
-                logger.info(f"Created backup: {backup_file}")
-
-            # Save new data
-            with open(self.data_file, "w") as f:
-                json.dump(transactions, f, default=str, indent=2)
-            logger.info(f"Saved {len(transactions)} transactions to local storage")
-            return True
-        except Exception as e:
-            logger.error(f"Error saving local transactions: {e}")
-            return False
+        size = -(-len(months) // partitions)
+        ranges = []
+        for i in range(0, len(months), size):
+            group = months[i : i + size]
+            first_year, first_month = map(int, group[0].split("-"))
+            last_year, last_month = map(int, group[-1].split("-"))
+            start = date(first_year, first_month, 1).isoformat()
+            end = date(
+                last_year,
+                last_month,
+                calendar.monthrange(last_year, last_month)[1],
+            ).isoformat()
+            # Never widen the range the caller asked for
+            start = max(start, params.get("start_date", start))
+            end = min(end, params.get("end_date", end))
+            ranges.append({**params, "start_date": start, "end_date": end})
+        return ranges
+
+    def _fetch_all_transactions(self, params, page_size, max_workers):
+        """Fetch every page matching params, optionally in parallel."""
+        if max_workers <= 1:
+            return self._fetch_pages(params, page_size)
+
+        partitions = self._month_partitions(params, max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda part: self._fetch_pages(part, page_size), partitions
+            )
+            return [frame for frames in results for frame in frames]
 
     def get_transactions(
-        self, start_date=None, end_date=None, category=None, type=None
+        self,
+        start_date=None,
+        end_date=None,
+        category=None,
+        type=None,
+        page_size=PAGE_SIZE,
+        max_workers=1,
     ):
-        """Fetch transactions from API with optional filters."""
+        """Fetch transactions from API with optional filters.
+
+        All matching rows are returned: the API is paged with keyset cursors,
+        and with ``max_workers`` > 1 the date range is split by month so that
+        several pages are in flight at once.
+        """
         # Try to use API if available
         if self.is_api_available:
             try:
@@ -126,57 +406,94 @@ class DashBorgesClient:
                 if type:
                     params["type"] = type
 
-                response = requests.get(f"{self.base_url}/transactions/", params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data:
-                        df = pd.DataFrame(data)
+                frames = self._fetch_all_transactions(params, page_size, max_workers)
+                frames = [frame for frame in frames if not frame.empty]
+                if frames:
+                    df = pd.concat(frames, ignore_index=True)
+                    if not pd.api.types.is_datetime64_any_dtype(df["date"]):
                         df["date"] = pd.to_datetime(df["date"])
-                        return df
-                    return pd.DataFrame(
-                        {
-                            "date": [],
-                            "category": [],
-                            "description": [],
-                            "amount": [],
-                            "type": [],
-                        }
-                    )
+                    return df
+                return pd.DataFrame(
+                    {
+                        "date": [],
+                        "category": [],
+                        "description": [],
+                        "amount": [],
+                        "type": [],
+                    }
+                )
+            except requests.exceptions.HTTPError as e:
+                logger.warning(f"API request failed: {e}. Using local storage.")
             except requests.exceptions.RequestException:
                 self.is_api_available = False
                 logger.warning("API connection failed. Switching to offline mode.")
 
         # Fallback to local storage
-        transactions = self._load_local_transactions()
-        df = (
-            pd.DataFrame(transactions)
-            if transactions
-            else pd.DataFrame(
-                {
-                    "date": [],
-                    "category": [],
-                    "description": [],
-                    "amount": [],
-                    "type": [],
-                }
+        return self.local_store.query(start_date, end_date, category, type)
+
+    def get_transaction_page(
+        self, start_date=None, end_date=None, offset=0, limit=50, sort="-date"
+    ):
+        """Fetch one sorted page of transactions in a date range from the API.
+
+        Returns (page, total) where total counts every transaction in the
+        range, or None when the API can't be used. Both requests are ETag
+        revalidated, so an unchanged page costs two header round trips.
+        """
+        if not self.is_api_available:
+            return None
+
+        params = {}
+        if start_date:
+            params["start_date"] = (
+                start_date.isoformat() if isinstance(start_date, date) else start_date
             )
-        )
+        if end_date:
+            params["end_date"] = (
+                end_date.isoformat() if isinstance(end_date, date) else end_date
+            )
+        try:
+            summary = self._get("/summary/", params=params)
+            summary.raise_for_status()
+            response = self._get(
+                "/transactions/",
+                params={**params, "skip": offset, "limit": limit, "sort": sort},
+            )
+            response.raise_for_status()
+            page = pd.DataFrame(
+                response.json(),
+                columns=["id", "date", "category", "description", "amount", "type"],
+            )
+            page["date"] = pd.to_datetime(page["date"])
+            return page, summary.json().get("count", 0)
+        except requests.exceptions.HTTPError as e:
+            logger.warning(f"Transaction page request failed: {e}")
+        except requests.exceptions.RequestException:
+            self.is_api_available = False
+            logger.warning("API connection failed. Switching to offline mode.")
+        return None
+
+    def get_changes(self, since=None):
+        """Fetch the rows changed on the server after data version ``since``.
+
+        Returns the change feed (``version``, ``reset``, ``upserts`` and
+        ``deleted``), or None when the API can't be reached.
+        """
+        if not self.is_api_available:
+            return None
 
-        # Apply filters if data exists
-        if not df.empty:
-            df["date"] = pd.to_datetime(df["date"])
-            if start_date:
-                start_date = pd.to_datetime(start_date)
-                df = df[df["date"] >= start_date]
-            if end_date:
-                end_date = pd.to_datetime(end_date)
-                df = df[df["date"] <= end_date]
-            if category:
-                df = df[df["category"] == category]
-            if type:
-                df = df[df["type"] == type.lower()]
-
-        return df
+        try:
+            params = {} if since is None else {"since": since}
+            response = self._request("GET", "/transactions/changes", params=params)
+            if response.status_code == 200:
+                return response.json()
+            logger.warning(
+                f"Change feed request failed with status {response.status_code}"
+            )
+        except requests.exceptions.RequestException:
+            self.is_api_available = False
+            logger.warning("API connection failed. Switching to offline mode.")
+        return None
 
     def add_transaction(self, date_val, category, description, amount, trans_type):
         """Add a single transaction."""
@@ -194,9 +511,7 @@ class DashBorgesClient:
         # Try API if available
         if self.is_api_available:
             try:
-                response = requests.post(
-                    f"{self.base_url}/transactions/", json=transaction
-                )
+                response = self._request("POST", "/transactions/", json=transaction)
                 api_success = response.status_code == 200 or response.status_code == 201
                 if api_success:
                     return True
@@ -208,60 +523,173 @@ class DashBorgesClient:
                 logger.warning("API connection failed. Switching to offline mode.")
 
         # Fallback to local storage
-        transactions = self._load_local_transactions()
-
-        # Add ID for local transactions
-        transaction["id"] = len(transactions) + 1 if transactions else 1
-        transactions.append(transaction)
+        try:
+            self.local_store.add(transaction)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error saving local transaction: {e}")
+            return False
 
-        return self._save_local_transactions(transactions)
+    def _records_from_frame(self, df):
+        """Build the bulk upload payload from a DataFrame without a row loop.
 
-    def bulk_upload_transactions(self, df):
-        """Upload multiple transactions from a DataFrame."""
+        A missing description is sent as an empty string; other missing
+        fields are sent as null, so the API rejects those rows.
+        """
+        dates = df["date"]
+        try:
+            dates = pd.to_datetime(dates).dt.strftime("%Y-%m-%d")
+        except (ValueError, TypeError):
+            # Leave unparseable dates for the API to reject row by row
+            dates = dates.astype(str).where(dates.notna())
+
+        payload = pd.DataFrame(
+            {
+                "date": dates,
+                "category": df["category"].astype(str).where(df["category"].notna()),
+                "description": df["description"].fillna("").astype(str),
+                "amount": df["amount"].astype(float),
+                "type": df["type"].astype(str).str.lower().where(df["type"].notna()),
+            }
+        )
+        return payload.astype(object).where(payload.notna(), None).to_dict("records")
+
+    def _post_chunk(self, chunk):
+        """POST one bulk chunk, retrying connection failures with backoff.
+
+        The bulk endpoint isn't idempotent and commits as it goes, so only
+        attempts that never reached the server are retried. Returns an
+        ``(outcome, report)`` pair: ``"sent"`` with the server's report,
+        ``"unsent"`` when nothing was inserted, or ``"unknown"`` when the
+        response was lost or the server failed part way, so some rows may
+        have been inserted.
+        """
+        for attempt in range(UPLOAD_RETRIES):
+            try:
+                response = self._request("POST", "/transactions/bulk/", json=chunk)
+            except requests.exceptions.RequestException as e:
+                if not _never_sent(e):
+                    logger.error(f"Bulk chunk outcome unknown: {e}")
+                    return "unknown", None
+                logger.warning(f"Bulk chunk attempt {attempt + 1} failed: {e}")
+                if attempt < UPLOAD_RETRIES - 1:
+                    time.sleep(UPLOAD_BACKOFF * 2**attempt)
+                continue
+            if response.status_code == 200 or response.status_code == 201:
+                return "sent", response.json()
+            if response.status_code < 500:
+                # Rejected before anything was inserted
+                logger.warning(
+                    f"Bulk chunk rejected with status {response.status_code}"
+                )
+                return "unsent", None
+            logger.error(f"Bulk chunk failed with status {response.status_code}")
+            return "unknown", None
+        return "unsent", None
+
+    def bulk_upload_transactions(self, df, chunk_size=UPLOAD_CHUNK_SIZE, max_workers=1):
+        """Upload multiple transactions from a DataFrame.
+
+        Rows are sent in chunks of ``chunk_size`` (``max_workers`` at a time).
+        Chunks that never reached the server end up in local storage, and
+        the client only switches to offline mode when none got through.
+        Chunks whose outcome is unknown are neither resent nor stored, as
+        that could insert their rows twice.
+
+        Returns the row counts: ``created`` and ``rejected`` by the server,
+        ``queued`` in local storage and ``unknown``. Returns None when there
+        was nothing to upload or local storage failed.
+        """
         if df.empty:
-            return False
+            return None
 
-        # Convert DataFrame to list of dicts
-        transactions = []
-        for _, row in df.iterrows():
-            transactions.append(
-                {
-                    "date": row["date"].isoformat()
-                    if isinstance(row["date"], (datetime, date))
-                    else row["date"],
-                    "category": row["category"],
-                    "description": row["description"],
-                    "amount": float(row["amount"]),
-                    "type": row["type"].lower(),
-                }
-            )
+        transactions = self._records_from_frame(df)
+        chunks = [
+            transactions[start : start + chunk_size]
+            for start in range(0, len(transactions), chunk_size)
+        ]
+
+        report = {"created": 0, "rejected": 0, "queued": 0, "unknown": 0}
 
         # Try API if available
+        failed_chunks = chunks
         if self.is_api_available:
-            try:
-                response = requests.post(
-                    f"{self.base_url}/transactions/bulk/", json=transactions
-                )
-                api_success = response.status_code == 200 or response.status_code == 201
-                if api_success:
-                    return True
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(self._post_chunk, chunks))
+            failed_chunks = []
+            for chunk, (outcome, sent) in zip(chunks, results):
+                if outcome == "sent":
+                    report["created"] += sent["created"]
+                    report["rejected"] += sent["rejected"]
+                elif outcome == "unknown":
+                    report["unknown"] += len(chunk)
                 else:
-                    self.is_api_available = False
-                    logger.warning("API request failed. Switching to offline mode.")
-            except requests.exceptions.RequestException:
+                    failed_chunks.append(chunk)
+            if report["rejected"]:
+                logger.warning(f"API rejected {report['rejected']} rows")
+            if report["unknown"]:
+                logger.error(
+                    f"{report['unknown']} rows may not have been saved; "
+                    "not resending them to avoid duplicates"
+                )
+            if not failed_chunks:
+                return report
+            if len(failed_chunks) == len(chunks):
                 self.is_api_available = False
-                logger.warning("API connection failed. Switching to offline mode.")
+                logger.warning("API request failed. Switching to offline mode.")
+            else:
+                logger.warning(
+                    f"{len(failed_chunks)} of {len(chunks)} chunks failed. "
+                    "Saving them to local storage."
+                )
 
-        # Fallback to local storage
-        existing_transactions = self._load_local_transactions()
-        next_id = len(existing_transactions) + 1 if existing_transactions else 1
+        # Fallback to local storage, which skips the rows the API would reject
+        rows = [transaction for chunk in failed_chunks for transaction in chunk]
+        dates = pd.to_datetime(
+            pd.Series([row["date"] for row in rows], dtype=object), errors="coerce"
+        )
+        complete = [
+            row
+            for row, valid in zip(rows, dates.notna())
+            if valid and None not in row.values()
+        ]
+        if len(complete) < len(rows):
+            logger.warning(f"Skipped {len(rows) - len(complete)} invalid rows")
+        try:
+            self.local_store.add_many(complete)
+        except sqlite3.Error as e:
+            logger.error(f"Error saving local transactions: {e}")
+            return None
+        report["rejected"] += len(rows) - len(complete)
+        report["queued"] += len(complete)
+        return report
+
+    def import_csv(self, file, filename="transactions.csv"):
+        """Send a CSV file to the server-side chunked import endpoint.
 
-        for transaction in transactions:
-            transaction["id"] = next_id
-            next_id += 1
-            existing_transactions.append(transaction)
+        Returns the import report, a dict with a ``detail`` message when the
+        server rejected the file, or None when the API couldn't be used.
+        """
+        if not self.is_api_available:
+            return None
 
-        return self._save_local_transactions(existing_transactions)
+        try:
+            # Large imports take a while server side, so don't cap the read
+            response = self._request(
+                "POST",
+                "/transactions/import",
+                files={"file": (filename, file, "text/csv")},
+                timeout=(HTTP_CONNECT_TIMEOUT, None),
+            )
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 400:
+                return response.json()
+            logger.warning(f"CSV import failed with status {response.status_code}")
+        except requests.exceptions.RequestException:
+            self.is_api_available = False
+            logger.warning("API connection failed. Switching to offline mode.")
+        return None
 
     def update_transaction(
         self, transaction_id, date_val, category, description, amount, trans_type
@@ -278,11 +706,15 @@ class DashBorgesClient:
             "type": trans_type.lower(),
         }
 
+        # Negative ids are rows created offline that haven't been synced yet
+        if transaction_id < 0:
+            return self.local_store.update(transaction_id, transaction)
+
         # Try API if available
         if self.is_api_available:
             try:
-                response = requests.put(
-                    f"{self.base_url}/transactions/{transaction_id}", json=transaction
+                response = self._request(
+                    "PUT", f"/transactions/{transaction_id}", json=transaction
                 )
                 api_success = response.status_code == 200
                 if api_success:
@@ -294,25 +726,22 @@ class DashBorgesClient:
                 self.is_api_available = False
                 logger.warning("API connection failed. Switching to offline mode.")
 
-        # Fallback to local storage
-        transactions = self._load_local_transactions()
-
-        # Find and update the transaction
-        for i, trans in enumerate(transactions):
-            if trans.get("id") == transaction_id:
-                transactions[i].update(transaction)
-                transactions[i]["id"] = transaction_id
-                return self._save_local_transactions(transactions)
-
-        return False
+        # Fallback to local storage, replayed on the server by the next sync
+        try:
+            return self.local_store.record_update(transaction_id, transaction)
+        except sqlite3.Error as e:
+            logger.error(f"Error updating local transaction: {e}")
+            return False
 
     def delete_transaction(self, transaction_id):
         """Delete a transaction."""
+        if transaction_id < 0:
+            return self.local_store.delete(transaction_id)
+
         # Try API if available
         if self.is_api_available:
             try:
-                endpoint = f"{self.base_url}/transactions/{transaction_id}"
-                response = requests.delete(endpoint)
+                response = self._request("DELETE", f"/transactions/{transaction_id}")
                 api_success = response.status_code == 200
                 if api_success:
                     return True
@@ -323,16 +752,202 @@ class DashBorgesClient:
                 self.is_api_available = False
                 logger.warning("API connection failed. Switching to offline mode.")
 
-        # Fallback to local storage
-        transactions = self._load_local_transactions()
+        # Fallback to local storage, replayed on the server by the next sync
+        try:
+            return self.local_store.record_delete(transaction_id)
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting local transaction: {e}")
+            return False
 
-        # Find and remove the transaction
-        for i, trans in enumerate(transactions):
-            if trans.get("id") == transaction_id:
-                transactions.pop(i)
-                return self._save_local_transactions(transactions)
+    def apply_changes(self, updates=(), deletes=()):
+        """Apply a batch of edits and deletes made in the transaction table.
+
+        ``updates`` are transaction dicts with their ``id``; ``deletes`` are
+        ids. Server rows go to the API as sync operations, a batch per
+        request, so the whole set costs one round trip per
+        ``SYNC_BATCH_SIZE`` changes. Unsynced local rows, and everything
+        when the API is unreachable, are handled by the local store. Edits
+        that leave a required field empty are counted as invalid and
+        dropped. Returns the counts per outcome.
+        """
+        report = {"applied": 0, "conflict": 0, "invalid": 0, "queued": 0}
+        operations = []
+        for transaction in updates:
+            transaction = dict(transaction)
+            transaction_id = int(transaction.pop("id"))
+            # A cleared table cell comes back as None or NaN
+            if any(pd.isna(transaction[field]) for field in REQUIRED_FIELDS):
+                logger.warning(f"Edit of {transaction_id} misses a required field")
+                report["invalid"] += 1
+                continue
+            if isinstance(transaction["date"], (datetime, date)):
+                transaction["date"] = transaction["date"].isoformat()
+            transaction["amount"] = float(transaction["amount"])
+            transaction["type"] = transaction["type"].lower()
+            if pd.isna(transaction["description"]):
+                transaction["description"] = ""
+            if transaction_id < 0:
+                applied = self.local_store.update(transaction_id, transaction)
+                report["applied" if applied else "conflict"] += 1
+            else:
+                operations.append(
+                    {
+                        "key": uuid.uuid4().hex,
+                        "op": "update",
+                        "id": transaction_id,
+                        "data": transaction,
+                    }
+                )
+        for transaction_id in deletes:
+            transaction_id = int(transaction_id)
+            if transaction_id < 0:
+                applied = self.local_store.delete(transaction_id)
+                report["applied" if applied else "conflict"] += 1
+            else:
+                operations.append(
+                    {"key": uuid.uuid4().hex, "op": "delete", "id": transaction_id}
+                )
 
-        return False
+        for start in range(0, len(operations), SYNC_BATCH_SIZE):
+            batch = operations[start : start + SYNC_BATCH_SIZE]
+            results = self._post_sync_batch(batch) if self.is_api_available else None
+            if results is not None:
+                for result in results:
+                    report[result["status"]] += 1
+                continue
+
+            # Queued for the next sync; replaying an edit is harmless if
+            # the server did apply it before the connection failed
+            for operation in batch:
+                if operation["op"] == "update":
+                    self.local_store.record_update(operation["id"], operation["data"])
+                else:
+                    self.local_store.record_delete(operation["id"])
+                report["queued"] += 1
+        return report
+
+    def _post_sync_batch(self, operations):
+        """POST one batch of offline operations, retrying transient failures.
+
+        Resending is safe: the server recognizes the idempotency keys of
+        operations it already applied. A batch over the server's size limit
+        is split in halves. Returns None, leaving the operations queued, when
+        the batch couldn't be delivered or the server refused it as a whole;
+        only per-operation results mark operations as resolved.
+        """
+        for attempt in range(UPLOAD_RETRIES):
+            try:
+                response = self._request("POST", "/transactions/sync", json=operations)
+                if response.status_code == 200:
+                    return response.json()["results"]
+                if response.status_code == 413 and len(operations) > 1:
+                    middle = len(operations) // 2
+                    first = self._post_sync_batch(operations[:middle])
+                    if first is None:
+                        return None
+                    second = self._post_sync_batch(operations[middle:])
+                    if second is None:
+                        return None
+                    return first + second
+                if (
+                    response.status_code < 500
+                    and response.status_code not in SYNC_RETRY_STATUSES
+                ):
+                    logger.warning(
+                        f"Sync batch refused with status {response.status_code},"
+                        " keeping it queued"
+                    )
+                    return None
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Sync batch attempt {attempt + 1} failed: {e}")
+            if attempt < UPLOAD_RETRIES - 1:
+                time.sleep(UPLOAD_BACKOFF * 2**attempt)
+        self.is_api_available = False
+        return None
+
+    def sync(self, batch_size=SYNC_BATCH_SIZE):
+        """Replay the changes made offline against the API.
+
+        Queued operations go out ``batch_size`` per request. Conflicts (edits
+        of rows deleted on the server meanwhile) and operations the server
+        marks invalid are logged and dropped; a batch refused as a whole
+        stays queued. Returns the counts per outcome, or
+        None when another sync is already running.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return None
+        report = {"applied": 0, "conflict": 0, "invalid": 0, "pending": 0}
+        try:
+            while self.is_api_available:
+                operations = self.local_store.pending(batch_size)
+                if not operations:
+                    break
+                results = self._post_sync_batch(operations)
+                if results is None:
+                    break
+
+                for result in results:
+                    report[result["status"]] += 1
+                    if result["status"] != "applied":
+                        logger.warning(f"Offline change not applied: {result}")
+                before = self.local_store.pending_count()
+                self.local_store.acknowledge(operations)
+                if self.local_store.pending_count() >= before:
+                    break  # Everything sent was edited again meanwhile
+        finally:
+            report["pending"] = self.local_store.pending_count()
+            self._sync_lock.release()
+
+        if report["applied"] or report["conflict"] or report["invalid"]:
+            logger.info(f"Synced offline changes: {report}")
+        return report
+
+    def _sync_in_background(self):
+        threading.Thread(target=self.sync, name="dashborges-sync", daemon=True).start()
+
+    def get_analytics(self, start_date=None, end_date=None):
+        """Fetch the chart aggregates for a date range from the API.
+
+        Returns a dict of DataFrames: ``monthly`` (month, income, expenses,
+        balance), ``categories`` (category, total, count of expenses) and
+        ``balance`` (date, net, balance per day). Returns None when the API
+        can't be used.
+        """
+        if not self.is_api_available:
+            return None
+
+        params = {}
+        if start_date:
+            params["start_date"] = (
+                start_date.isoformat() if isinstance(start_date, date) else start_date
+            )
+        if end_date:
+            params["end_date"] = (
+                end_date.isoformat() if isinstance(end_date, date) else end_date
+            )
+
+        endpoints = {
+            "monthly": (
+                "/analytics/monthly",
+                ["month", "income", "expenses", "balance"],
+            ),
+            "categories": ("/analytics/categories", ["category", "total", "count"]),
+            "balance": ("/analytics/balance-series", ["date", "net", "balance"]),
+        }
+        try:
+            analytics = {}
+            for name, (path, columns) in endpoints.items():
+                response = self._get(path, params=params)
+                response.raise_for_status()
+                analytics[name] = pd.DataFrame(response.json(), columns=columns)
+            analytics["balance"]["date"] = pd.to_datetime(analytics["balance"]["date"])
+            return analytics
+        except requests.exceptions.HTTPError as e:
+            logger.warning(f"Analytics request failed: {e}")
+        except requests.exceptions.RequestException:
+            self.is_api_available = False
+            logger.warning("API connection failed. Switching to offline mode.")
+        return None
 
     def get_summary(self, start_date=None, end_date=None):
         """Get financial summary for a time period."""
@@ -351,7 +966,7 @@ class DashBorgesClient:
                         end_date.isoformat() if isinstance(end_date, date) else end_date
                     )
 
-                response = requests.get(f"{self.base_url}/summary/", params=params)
+                response = self._get("/summary/", params=params)
                 if response.status_code == 200:
                     return response.json()
             except requests.exceptions.RequestException:
@@ -359,9 +974,11 @@ class DashBorgesClient:
                 logger.warning("API connection failed. Switching to offline mode.")
 
         # Fallback: calculate summary from local data
-        df = self.get_transactions(start_date, end_date)
+        total_income, total_expenses, count = self.local_store.summary(
+            start_date, end_date
+        )
 
-        if df.empty:
+        if not count:
             return {
                 "total_income": 0,
                 "total_expenses": 0,
@@ -369,8 +986,6 @@ class DashBorgesClient:
                 "period": "No data",
             }
 
-        total_income = df[df["type"] == "income"]["amount"].sum()
-        total_expenses = df[df["type"] == "expense"]["amount"].sum()
         balance = total_income - total_expenses
 
         period = "All time"
@@ -387,3 +1002,19 @@ class DashBorgesClient:
             "balance": balance,
             "period": period,
         }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url=DEFAULT_BASE_URL):
+    """Return the process-wide client for base_url, creating it on first use.
+
+    Streamlit sessions share the client, and with it the connection pool.
+    """
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = _clients[base_url] = DashBorgesClient(base_url)
+        return client
@@ -0,0 +1,181 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S"
+
+# Seconds between scheduled snapshots, 0 to disable the schedule
+BACKUP_INTERVAL = int(os.environ.get("DASHBORGES_BACKUP_INTERVAL", "3600"))
+
+# Snapshots kept per bucket: the newest N snapshots, plus the newest one of
+# each of the most recent N hours, days and ISO weeks, survive pruning
+BACKUP_RETENTION = {
+    "latest": int(os.environ.get("DASHBORGES_BACKUP_KEEP_LATEST", "5")),
+    "hourly": int(os.environ.get("DASHBORGES_BACKUP_KEEP_HOURLY", "24")),
+    "daily": int(os.environ.get("DASHBORGES_BACKUP_KEEP_DAILY", "7")),
+    "weekly": int(os.environ.get("DASHBORGES_BACKUP_KEEP_WEEKLY", "8")),
+}
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_snapshots(backup_dir, prefix):
+    """Return (timestamp, digest, path) for each snapshot, newest first."""
+    snapshots = []
+    if not os.path.isdir(backup_dir):
+        return snapshots
+    for name in os.listdir(backup_dir):
+        if not (name.startswith(f"{prefix}_") and name.endswith(".db")):
+            continue
+        try:
+            stamp, digest = name[len(prefix) + 1 : -3].split("_")
+            taken = datetime.strptime(stamp, TIMESTAMP_FORMAT)
+        except ValueError:
+            continue
+        snapshots.append((taken, digest, os.path.join(backup_dir, name)))
+    return sorted(snapshots, reverse=True)
+
+
+def snapshot_sqlite(source_path, backup_dir, prefix):
+    """Take a consistent snapshot of a live SQLite database.
+
+    Uses SQLite's online backup API, so concurrent writers are never blocked
+    for long and the WAL is included. Snapshots are named after a hash of
+    their content; when nothing changed since the latest one, the new copy
+    is discarded and the latest snapshot's path is returned.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    taken = datetime.now()
+    tmp_path = os.path.join(backup_dir, f".{prefix}_{os.getpid()}.tmp")
+
+    source = sqlite3.connect(source_path)
+    try:
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target, pages=1024)
+        finally:
+            target.close()
+    finally:
+        source.close()
+
+    digest = _file_digest(tmp_path)[:16]
+    snapshots = list_snapshots(backup_dir, prefix)
+    if snapshots and snapshots[0][1] == digest:
+        os.remove(tmp_path)
+        return snapshots[0][2]
+
+    path = os.path.join(
+        backup_dir, f"{prefix}_{taken.strftime(TIMESTAMP_FORMAT)}_{digest}.db"
+    )
+    os.replace(tmp_path, path)
+    logger.info(f"Backup snapshot created: {path}")
+    return path
+
+
+def prune_snapshots(backup_dir, prefix, retention=None):
+    """Delete the snapshots no retention bucket wants to keep."""
+    retention = retention or BACKUP_RETENTION
+    bucket_keys = {
+        # Every snapshot is its own bucket, so manual snapshots taken in the
+        # same hour as a scheduled one aren't pruned straight away
+        "latest": lambda taken: taken,
+        "hourly": lambda taken: taken.strftime("%Y%m%d%H"),
+        "daily": lambda taken: taken.strftime("%Y%m%d"),
+        "weekly": lambda taken: taken.isocalendar()[:2],
+    }
+
+    snapshots = list_snapshots(backup_dir, prefix)
+    keep = set()
+    for bucket, count in retention.items():
+        seen = set()
+        for taken, _, path in snapshots:
+            key = bucket_keys[bucket](taken)
+            if key in seen:
+                continue
+            if len(seen) >= count:
+                break
+            seen.add(key)
+            keep.add(path)
+
+    removed = []
+    for _, _, path in snapshots:
+        if path not in keep:
+            os.remove(path)
+            removed.append(path)
+    if removed:
+        logger.info(f"Pruned {len(removed)} old {prefix} snapshots")
+    return removed
+
+
+class BackupScheduler:
+    """Snapshot and prune a SQLite database periodically, off the request path.
+
+    Only one process per backup directory runs the schedule: the scheduler
+    takes a non-blocking lock on a file there and stays idle without it.
+    """
+
+    def __init__(self, source_path, backup_dir, prefix, interval, retention=None):
+        self.source_path = source_path
+        self.backup_dir = backup_dir
+        self.prefix = prefix
+        self.interval = interval
+        self.retention = retention
+        self._stop = threading.Event()
+        self._lock_file = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"dashborges-backup-{prefix}", daemon=True
+        )
+
+    def start(self):
+        if self._acquire_leadership():
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        """Take a snapshot and apply the retention policy."""
+        try:
+            path = snapshot_sqlite(self.source_path, self.backup_dir, self.prefix)
+            prune_snapshots(self.backup_dir, self.prefix, self.retention)
+            return path
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Error creating {self.prefix} backup: {e}")
+            return None
+
+    def _acquire_leadership(self):
+        try:
+            import fcntl
+        except ImportError:  # No POSIX file locks, e.g. on Windows
+            return True
+
+        os.makedirs(self.backup_dir, exist_ok=True)
+        self._lock_file = open(
+            os.path.join(self.backup_dir, f".{self.prefix}.lock"), "w"
+        )
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+
+    def _run(self):
+        # Snapshot on startup too, so a fresh process isn't left without a
+        # backup for a whole interval
+        self.run_once()
+        while not self._stop.wait(self.interval):
+            self.run_once()
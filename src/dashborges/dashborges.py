@@ -1,6 +1,5 @@
 import streamlit as st
 from datetime import datetime
-import calendar
 import pandas as pd
 import sys
 import argparse
@@ -10,6 +9,10 @@ from data_handler import (
     add_transaction,
     generate_sample_data,
     get_api_status,
+    get_chart_data,
+    get_ledger_index,
+    get_pending_changes,
+    load_transactions,
     set_api_port,
 )
 from ui_components import (
@@ -22,7 +25,7 @@ from visualizations import (
     create_expense_category_chart,
     create_balance_trend_chart,
 )
-from utils import calculate_summary, filter_data_by_time
+from utils import TIME_FILTERS, get_time_window, year_earlier
 
 # Parse command-line arguments for API port
 parser = argparse.ArgumentParser()
@@ -59,17 +62,13 @@ if not api_available:
     st.warning("""
         ⚠️ Running in offline mode. API server is not available.
         To use the full features, run the API server with: `python main.py`
-        Your data will be stored locally and can be synchronized when the API is available.
+        Your data will be stored locally and synchronized automatically when the API is available.
     """)
 
 # Initialize session state for data storage
 if "transactions" not in st.session_state:
-    # Import client to load existing transactions
-    from api_client import DashBorgesClient
-
-    # Initialize client and fetch transactions
-    client = DashBorgesClient()
-    st.session_state["transactions"] = client.get_transactions()
+    # Fetch existing transactions through the shared client
+    load_transactions()
 
     # Add debug info showing that data was loaded
     st.sidebar.info(
@@ -102,20 +101,42 @@ if (
     # Time period filter
     col1, col2, col3 = st.columns(3)
     with col1:
-        time_filter = st.selectbox(
-            "Time Period", ["All Time", "This Month", "This Year"]
-        )
-
-    # Filter data based on time period selection
-    filtered_df, period_name = filter_data_by_time(
-        st.session_state["transactions"], time_filter
-    )
+        time_filter = st.selectbox("Time Period", TIME_FILTERS + ["Custom Range"])
+
+    if time_filter == "Custom Range":
+        with col2:
+            selected = st.date_input(
+                "Date Range",
+                (datetime.now().date().replace(day=1), datetime.now().date()),
+            )
+        # The picker returns a one-date tuple while the range is being chosen
+        # and an empty one once cleared, which shows everything
+        selected = tuple(selected)
+        if selected:
+            start_date, end_date = (selected * 2)[:2]
+            period_name = f"{start_date} to {end_date}"
+        else:
+            start_date, end_date, period_name = get_time_window("All Time")
+    else:
+        start_date, end_date, period_name = get_time_window(time_filter)
+
+    # Window totals and rows come from the prefix-sum index of the ledger
+    ledger = get_ledger_index()
+    filtered_df = ledger.rows(start_date, end_date)
+    chart_data = get_chart_data(start_date, end_date, filtered_df)
 
     # Calculate summary statistics
-    total_income, total_expenses, balance = calculate_summary(filtered_df)
+    total_income, total_expenses, balance = ledger.summary(start_date, end_date)
+
+    # The same window a year earlier, for bounded periods
+    previous = None
+    if start_date and end_date:
+        previous = ledger.summary(year_earlier(start_date), year_earlier(end_date))
 
     # Display financial summary metrics
-    display_financial_summary(period_name, total_income, total_expenses, balance)
+    display_financial_summary(
+        period_name, total_income, total_expenses, balance, previous
+    )
 
     # Row for charts
     st.subheader("Financial Analytics")
@@ -124,19 +145,19 @@ if (
     # Income vs Expenses chart
     with col1:
         st.write("Income vs Expenses")
-        create_income_expense_chart(filtered_df)
+        create_income_expense_chart(chart_data["monthly"])
 
     # Expense categories chart
     with col2:
         st.write("Expense Categories")
-        create_expense_category_chart(filtered_df)
+        create_expense_category_chart(chart_data["categories"])
 
     # Balance over time trend
     st.subheader("Balance Trends")
-    create_balance_trend_chart(filtered_df)
+    create_balance_trend_chart(chart_data["balance"])
 
     # Transactions table
-    display_transaction_table(filtered_df)
+    display_transaction_table(start_date, end_date)
 
 else:
     st.info(
@@ -154,3 +175,6 @@ st.caption("DashBorges - Personal Finance Dashboard | Created with Streamlit")
 # Add API status indicator in the footer
 api_status = "🟢 Connected" if api_available else "🔴 Offline"
 st.sidebar.markdown(f"API Status: {api_status}")
+pending_changes = get_pending_changes()
+if pending_changes:
+    st.sidebar.caption(f"{pending_changes} offline changes waiting to sync")
@@ -2,16 +2,17 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from api_client import DashBorgesClient
+from api_client import get_client
+from utils import LedgerIndex, balance_series, category_totals, monthly_totals
 
-# Create client instance
-client = DashBorgesClient()
+# Shared client instance
+client = get_client()
 
 
 def set_api_port(port):
     """Set the API port for the client."""
     global client
-    client = DashBorgesClient(base_url=f"http://127.0.0.1:{port}")
+    client = get_client(base_url=f"http://127.0.0.1:{port}")
     return client.is_api_available
 
 
@@ -20,9 +21,139 @@ def get_api_status():
     return client.is_api_available
 
 
+def load_transactions():
+    """Load the whole ledger into the session state.
+
+    The data version is read before the rows, so anything written during the
+    download is picked up again by the next refresh rather than missed.
+    """
+    changes = client.get_changes()
+    st.session_state["transactions"] = client.get_transactions()
+    st.session_state["data_version"] = changes["version"] if changes else None
+    return st.session_state["transactions"]
+
+
+def _merge_changes(df, changes):
+    """Apply a change feed to a cached transactions DataFrame."""
+    upserts = pd.DataFrame(changes["upserts"])
+    stale = set(changes["deleted"])
+    if not upserts.empty:
+        stale.update(upserts["id"])
+    if stale and "id" in df.columns:
+        df = df[~df["id"].isin(stale)]
+    if upserts.empty:
+        return df.reset_index(drop=True)
+
+    upserts["date"] = pd.to_datetime(upserts["date"])
+    if df.empty:
+        return upserts
+    upserts["date"] = upserts["date"].astype(df["date"].dtype)
+    return pd.concat([df, upserts], ignore_index=True).sort_values(
+        ["date", "id"], ignore_index=True
+    )
+
+
+def refresh_transactions():
+    """Bring the cached ledger up to date after a write.
+
+    Only the rows changed since the cached data version are fetched and
+    merged in. A full reload happens when there is no usable version: the
+    cache came from offline storage, or the server asked for a reset.
+    """
+    since = st.session_state.get("data_version")
+    if since is None or st.session_state.get("transactions") is None:
+        return load_transactions()
+
+    changes = client.get_changes(since)
+    if changes is None or changes["reset"]:
+        return load_transactions()
+
+    st.session_state["transactions"] = _merge_changes(
+        st.session_state["transactions"], changes
+    )
+    st.session_state["data_version"] = changes["version"]
+    return st.session_state["transactions"]
+
+
+def get_ledger_index():
+    """Prefix-sum index over the cached ledger.
+
+    Every load or refresh stores a new DataFrame, so the index is rebuilt
+    only when the ledger changed and reused across reruns otherwise.
+    """
+    transactions = st.session_state["transactions"]
+    index = st.session_state.get("ledger_index")
+    if index is None or index.source is not transactions:
+        index = LedgerIndex(transactions)
+        st.session_state["ledger_index"] = index
+    return index
+
+
+def get_chart_data(start_date, end_date, filtered_df):
+    """Aggregates behind the dashboard charts for a date range.
+
+    The API computes them in the database, so only chart-sized results are
+    transferred; offline they are computed from the local rows instead.
+    """
+    analytics = client.get_analytics(start_date, end_date)
+    if analytics is not None:
+        return analytics
+    return {
+        "monthly": monthly_totals(filtered_df),
+        "categories": category_totals(filtered_df),
+        "balance": balance_series(filtered_df),
+    }
+
+
+def get_transaction_page(start_date, end_date, page, page_size, sort="-date"):
+    """One sorted page of the transactions in a date range, and their total.
+
+    Pages come from the API, which sorts and slices in the database;
+    offline they are cut from the cached ledger instead.
+    """
+    offset = page * page_size
+    result = client.get_transaction_page(start_date, end_date, offset, page_size, sort)
+    if result is not None:
+        return result
+
+    rows = get_ledger_index().rows(start_date, end_date)
+    column = sort.lstrip("-")
+    # Ties broken by id, as the API does
+    keys = [column] if column == "id" else [column, "id"]
+    rows = rows.sort_values(keys, ascending=not sort.startswith("-"))
+    return rows.iloc[offset : offset + page_size], len(rows)
+
+
+def apply_transaction_changes(updates, deletes):
+    """Submit the edits and deletes made in the transaction table together."""
+    report = client.apply_changes(updates, deletes)
+    refresh_transactions()
+    return report
+
+
+def get_pending_changes():
+    """Number of offline changes waiting to be synced to the API."""
+    return client.local_store.pending_count()
+
+
 def load_csv_data(uploaded_file):
     """Load transaction data from a CSV file."""
     try:
+        # Let the API parse and import the file in chunks when it is online
+        report = client.import_csv(
+            uploaded_file, getattr(uploaded_file, "name", "transactions.csv")
+        )
+        if report is not None:
+            if "detail" in report:
+                return False, report["detail"]
+            refresh_transactions()
+            return (
+                True,
+                f"{report['created']} transactions imported"
+                f" ({report['rejected']} rejected).",
+            )
+        uploaded_file.seek(0)
+
         data = pd.read_csv(uploaded_file)
         required_columns = ["date", "category", "description", "amount", "type"]
 
@@ -30,12 +161,21 @@ def load_csv_data(uploaded_file):
             data["date"] = pd.to_datetime(data["date"])
 
             # Upload to API
-            success = client.bulk_upload_transactions(data)
-
-            if success:
-                # Fetch all transactions to update the state
-                st.session_state["transactions"] = client.get_transactions()
-                return True, "Data uploaded successfully!"
+            report = client.bulk_upload_transactions(data)
+
+            if report is not None:
+                # Merge the uploaded rows into the state
+                refresh_transactions()
+                message = (
+                    f"{report['created'] + report['queued']} transactions uploaded"
+                    f" ({report['rejected']} rejected)."
+                )
+                if report["unknown"]:
+                    message += (
+                        f" {report['unknown']} may not have been saved;"
+                        " check them before uploading again."
+                    )
+                return True, message
             else:
                 return False, "Failed to upload data."
         else:
@@ -53,8 +193,8 @@ def add_transaction(date, category, description, amount, trans_type):
     success = client.add_transaction(date, category, description, amount, trans_type)
 
     if success:
-        # Refresh transactions in session state
-        st.session_state["transactions"] = client.get_transactions()
+        # Merge the change into the transactions in session state
+        refresh_transactions()
         return True
     return False
 
@@ -141,39 +281,4 @@ def generate_sample_data():
     client.bulk_upload_transactions(sample_df)
 
     # Return data
-    return client.get_transactions()
-
-
-def get_transactions(
-    start_date=None, end_date=None, category=None, transaction_type=None
-):
-    """Get transactions with optional filters."""
-    return client.get_transactions(start_date, end_date, category, transaction_type)
-
-
-def update_transaction(transaction_id, date, category, description, amount, trans_type):
-    """Update an existing transaction."""
-    success = client.update_transaction(
-        transaction_id, date, category, description, amount, trans_type
-    )
-
-    if success:
-        # Refresh transactions in session state
-        import streamlit as st
-
-        st.session_state["transactions"] = client.get_transactions()
-        return True
-    return False
-
-
-def delete_transaction(transaction_id):
-    """Delete a transaction."""
-    success = client.delete_transaction(transaction_id)
-
-    if success:
-        # Refresh transactions in session state
-        import streamlit as st
-
-        st.session_state["transactions"] = client.get_transactions()
-        return True
-    return False
+    return load_transactions()
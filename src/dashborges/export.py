@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+import zlib
+
+# Column order shared by every export format
+EXPORT_COLUMNS = ("id", "date", "category", "description", "amount", "type")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def encode_ndjson(batches):
+    """Encode row batches as newline-delimited JSON."""
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n"
+            for row in rows
+        ).encode()
+
+
+def encode_csv(batches):
+    """Encode row batches as CSV, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def arrow_schema():
+    """Arrow schema matching the transactions table."""
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("date", pa.date32()),
+            ("category", pa.string()),
+            ("description", pa.string()),
+            ("amount", pa.float64()),
+            ("type", pa.string()),
+        ]
+    )
+
+
+def rows_to_record_batch(rows, schema):
+    """Transpose a list of row tuples into an Arrow record batch."""
+    import pyarrow as pa
+
+    columns = list(zip(*rows)) if rows else [[] for _ in EXPORT_COLUMNS]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def encode_arrow(batches):
+    """Encode row batches as an Arrow IPC stream, one record batch each."""
+    import pyarrow as pa
+
+    schema = arrow_schema()
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for rows in batches:
+            writer.write_batch(rows_to_record_batch(rows, schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate(0)
+    # End-of-stream marker written when the writer closes
+    yield sink.getvalue()
+
+
+def encode_columnar(rows, format):
+    """Encode a complete result set as an Arrow IPC stream or Parquet file."""
+    import pyarrow as pa
+
+    schema = arrow_schema()
+    table = pa.Table.from_batches([rows_to_record_batch(rows, schema)], schema=schema)
+    sink = io.BytesIO()
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+
+def negotiate_columnar(accept):
+    """Pick a columnar format from an Accept header, or None for JSON."""
+    if not accept:
+        return None
+    for media_range in accept.split(","):
+        media_type = media_range.split(";")[0].strip()
+        for format in ("arrow", "parquet"):
+            if media_type == MEDIA_TYPES[format]:
+                return format
+    return None
+
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+    "arrow": encode_arrow,
+}
+
+
+def gzip_stream(chunks):
+    """Compress a byte stream on the fly into a single gzip member."""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,278 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Same table layout and indexes as the server's transactions table, plus
+# the sync key of each row. Every row here was created offline and is
+# waiting to be synced; changes to rows that live on the server are kept in
+# pending_operations, at most one per server row.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date DATE NOT NULL,
+    category VARCHAR NOT NULL,
+    description VARCHAR NOT NULL,
+    amount FLOAT NOT NULL,
+    type VARCHAR NOT NULL,
+    sync_key VARCHAR
+);
+CREATE TABLE IF NOT EXISTS pending_operations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key VARCHAR NOT NULL UNIQUE,
+    op VARCHAR NOT NULL,
+    remote_id INTEGER NOT NULL UNIQUE,
+    payload VARCHAR
+);
+CREATE INDEX IF NOT EXISTS ix_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS ix_transactions_type_date ON transactions (type, date);
+CREATE INDEX IF NOT EXISTS ix_transactions_category_date
+    ON transactions (category, date);
+CREATE INDEX IF NOT EXISTS ix_transactions_summary
+    ON transactions (date, type, amount);
+"""
+
+COLUMNS = ("date", "category", "description", "amount", "type")
+
+# Column added to stores created before offline changes were synced
+MIGRATIONS = (
+    "ALTER TABLE transactions ADD COLUMN sync_key VARCHAR",
+    "UPDATE transactions SET sync_key = lower(hex(randomblob(16)))"
+    " WHERE sync_key IS NULL",
+)
+
+
+def _row(transaction):
+    """Column values for a transaction dict, with the date as YYYY-MM-DD."""
+    values = [transaction[column] for column in COLUMNS]
+    if not (isinstance(values[0], str) and len(values[0]) == 10):
+        values[0] = str(pd.to_datetime(values[0]).date())
+    return values
+
+
+class LocalStore:
+    """Embedded SQLite store backing the client's offline mode.
+
+    Writes are single-row inserts/updates by primary key and reads are
+    indexed, filtered queries, so offline mode costs the same per operation
+    no matter how large the ledger grows.
+
+    Local rows are exposed with negative ids so they never collide with the
+    ids of server rows; positive ids passed to ``record_update`` and
+    ``record_delete`` refer to the server.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = [
+            row[1] for row in self._conn.execute("PRAGMA table_info(transactions)")
+        ]
+        if "sync_key" not in columns:
+            for statement in MIGRATIONS:
+                self._conn.execute(statement)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _filters(self, start_date=None, end_date=None, category=None, type=None):
+        """Build the WHERE clause and parameters for the standard filters."""
+        clauses = []
+        params = []
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(str(pd.to_datetime(start_date).date()))
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(str(pd.to_datetime(end_date).date()))
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if type:
+            clauses.append("type = ?")
+            params.append(type.lower())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(self, start_date=None, end_date=None, category=None, type=None):
+        """Return the matching transactions as a DataFrame."""
+        where, params = self._filters(start_date, end_date, category, type)
+        with self._lock:
+            df = pd.read_sql_query(
+                f"SELECT -id AS id, {', '.join(COLUMNS)} FROM transactions{where}"
+                " ORDER BY date, transactions.id",
+                self._conn,
+                params=params,
+            )
+        df["date"] = pd.to_datetime(df["date"])
+        return df
+
+    def summary(self, start_date=None, end_date=None):
+        """Return (total_income, total_expenses, count) for a date range."""
+        where, params = self._filters(start_date, end_date)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT"
+                " COALESCE(SUM(CASE WHEN type = 'income' THEN amount END), 0),"
+                " COALESCE(SUM(CASE WHEN type = 'expense' THEN amount END), 0),"
+                f" COUNT(*) FROM transactions{where}",
+                params,
+            ).fetchone()
+
+    def add(self, transaction):
+        """Insert one transaction and return its (negative) id."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"INSERT INTO transactions ({', '.join(COLUMNS)}, sync_key)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                _row(transaction) + [uuid.uuid4().hex],
+            )
+            return -cursor.lastrowid
+
+    def add_many(self, transactions):
+        """Insert many transactions in a single transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO transactions ({', '.join(COLUMNS)}, sync_key)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (_row(t) + [uuid.uuid4().hex] for t in transactions),
+            )
+
+    def update(self, transaction_id, transaction):
+        """Update one local transaction. Returns False if it doesn't exist."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE transactions SET {', '.join(f'{c} = ?' for c in COLUMNS)}"
+                " WHERE id = ?",
+                _row(transaction) + [-transaction_id],
+            )
+            return cursor.rowcount > 0
+
+    def delete(self, transaction_id):
+        """Delete one local transaction. Returns False if it doesn't exist."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM transactions WHERE id = ?", (-transaction_id,)
+            )
+            return cursor.rowcount > 0
+
+    def record_update(self, remote_id, transaction):
+        """Queue an update of a server row for the next sync.
+
+        A later change to the same row replaces the queued one, under a new
+        idempotency key, so the log holds one operation per row however many
+        times it was edited. A queued delete isn't undone by an update.
+        """
+        payload = json.dumps(dict(zip(COLUMNS, _row(transaction))))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pending_operations (key, op, remote_id, payload)"
+                " VALUES (?, 'update', ?, ?)"
+                " ON CONFLICT (remote_id) DO UPDATE"
+                " SET key = excluded.key, payload = excluded.payload"
+                " WHERE op = 'update'",
+                (uuid.uuid4().hex, remote_id, payload),
+            )
+        return True
+
+    def record_delete(self, remote_id):
+        """Queue a delete of a server row, superseding any queued update."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pending_operations (key, op, remote_id)"
+                " VALUES (?, 'delete', ?)"
+                " ON CONFLICT (remote_id) DO UPDATE"
+                " SET key = excluded.key, op = 'delete', payload = NULL",
+                (uuid.uuid4().hex, remote_id),
+            )
+        return True
+
+    def pending_count(self):
+        """Number of operations waiting to be synced."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM transactions)"
+                " + (SELECT COUNT(*) FROM pending_operations)"
+            ).fetchone()[0]
+
+    def pending(self, limit):
+        """Return up to ``limit`` queued operations in the sync wire format.
+
+        Local rows come first as creates keyed by their sync key, followed by
+        the queued updates and deletes of server rows in the order recorded.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT sync_key, {', '.join(COLUMNS)} FROM transactions"
+                " ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+            operations = [
+                {"key": row[0], "op": "create", "data": dict(zip(COLUMNS, row[1:]))}
+                for row in rows
+            ]
+            if len(operations) < limit:
+                for key, op, remote_id, payload in self._conn.execute(
+                    "SELECT key, op, remote_id, payload FROM pending_operations"
+                    " ORDER BY seq LIMIT ?",
+                    (limit - len(operations),),
+                ):
+                    operation = {"key": key, "op": op, "id": remote_id}
+                    if payload is not None:
+                        operation["data"] = json.loads(payload)
+                    operations.append(operation)
+        return operations
+
+    def acknowledge(self, operations):
+        """Drop operations the server has resolved.
+
+        A local row is only dropped if it still holds the values that were
+        sent; edited in the meantime, it is sent again under the same key.
+        Queued server-row operations whose key was replaced are kept too.
+        """
+        creates = [op for op in operations if op["op"] == "create"]
+        others = [op for op in operations if op["op"] != "create"]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM transactions WHERE sync_key = ? AND "
+                + " AND ".join(f"{column} = ?" for column in COLUMNS),
+                (
+                    [op["key"]] + [op["data"][column] for column in COLUMNS]
+                    for op in creates
+                ),
+            )
+            self._conn.executemany(
+                "DELETE FROM pending_operations WHERE key = ?",
+                ((op["key"],) for op in others),
+            )
+
+    def import_json(self, json_path):
+        """One-off import of the legacy local_transactions.json file.
+
+        The file is renamed afterwards so the import never runs twice.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "r") as f:
+                transactions = json.load(f)
+            # Legacy ids weren't guaranteed unique, so rows get fresh ones
+            self.add_many(transactions)
+            os.replace(json_path, f"{json_path}.migrated")
+            logger.info(f"Imported {len(transactions)} transactions from {json_path}")
+            return len(transactions)
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            logger.error(f"Error importing local transactions: {e}")
+            return 0
@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """In-process LRU of aggregate query results, bounded by size and age.
+
+    Each entry remembers the data version it was computed at. The cache
+    itself doesn't know about writes: callers revalidate an entry whose
+    version is behind by checking whether any write since then touched the
+    dates it covers, then bump it with ``revalidate``.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300.0):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self._max_entries > 0 and self._ttl > 0
+
+    def get(self, key):
+        """Return (version, value) for a fresh entry, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            version, value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return version, value
+
+    def put(self, key, version, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (version, value, time.monotonic() + self._ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def revalidate(self, key, version):
+        """Mark an entry as still correct at a newer data version."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < version:
+                self._entries[key] = (version, entry[1], entry[2])
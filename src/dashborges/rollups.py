@@ -0,0 +1,274 @@
+import argparse
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .database import Rollup, SessionLocal, Transaction, init_db, next_data_version
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("day", "week", "month", "year")
+
+# Coarsest to finest, the granularities that nest inside each other exactly
+NESTED_GRANULARITIES = ("year", "month", "day")
+
+ONE_DAY = timedelta(days=1)
+
+
+def bucket_start(value, granularity):
+    """First day of the bucket holding a date. Weeks start on Monday."""
+    if granularity == "day":
+        return value
+    if granularity == "week":
+        return value - timedelta(days=value.weekday())
+    if granularity == "month":
+        return value.replace(day=1)
+    return value.replace(month=1, day=1)
+
+
+def next_bucket(start, granularity):
+    """First day of the bucket after the one starting at ``start``."""
+    if granularity == "day":
+        return start + ONE_DAY
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    return start.replace(year=start.year + 1)
+
+
+def _whole_buckets(start, end, granularity):
+    """Half-open range [first, stop) of bucket starts lying inside [start, end]."""
+    first = bucket_start(start, granularity)
+    if first < start:
+        first = next_bucket(first, granularity)
+    stop = bucket_start(end + ONE_DAY, granularity)
+    return first, stop
+
+
+def cover(start, end, granularities=NESTED_GRANULARITIES):
+    """Split [start, end] into runs of whole buckets, coarsest first.
+
+    Returns (granularity, first, stop) triples selecting the buckets that
+    start in [first, stop). A range of a few years comes down to a handful
+    of year, month and day runs.
+    """
+    granularity, finer = granularities[0], granularities[1:]
+    if not finer:
+        return [(granularity, start, end + ONE_DAY)]
+
+    first, stop = _whole_buckets(start, end, granularity)
+    if first >= stop:
+        return cover(start, end, finer)
+
+    segments = [(granularity, first, stop)]
+    if start < first:
+        segments = cover(start, first - ONE_DAY, finer) + segments
+    if stop <= end:
+        segments += cover(stop, end, finer)
+    return segments
+
+
+def _segment_filter(segments):
+    return or_(
+        *(
+            and_(
+                Rollup.granularity == granularity,
+                Rollup.bucket >= first,
+                Rollup.bucket < stop,
+            )
+            for granularity, first, stop in segments
+        )
+    )
+
+
+def data_range(db, start_date=None, end_date=None):
+    """Clamp a date range to the days holding data; None when nothing does."""
+    first, last = db.execute(
+        select(func.min(Rollup.bucket), func.max(Rollup.bucket)).where(
+            Rollup.granularity == "day"
+        )
+    ).one()
+    if first is None:
+        return None
+    start = max(start_date, first) if start_date else first
+    end = min(end_date, last) if end_date else last
+    if start > end:
+        return None
+    return start, end
+
+
+def range_totals(db, start_date, end_date, columns, type=None):
+    """Total and count over a date range, grouped by Rollup ``columns``.
+
+    Rows are (*columns, total, count).
+    """
+    bounds = data_range(db, start_date, end_date)
+    if bounds is None:
+        return []
+    query = (
+        select(*columns, func.sum(Rollup.total), func.sum(Rollup.count))
+        .where(_segment_filter(cover(*bounds)))
+        .group_by(*columns)
+    )
+    if type:
+        query = query.where(Rollup.type == type)
+    return db.execute(query).all()
+
+
+def bucket_totals(db, start_date, end_date, granularity, columns=()):
+    """Total and count per ``granularity`` bucket over a date range.
+
+    Whole buckets are read at that granularity; buckets cut by the ends of
+    the range are completed from day rollups. Rows are (bucket, *columns,
+    total, count), ordered by bucket.
+    """
+    bounds = data_range(db, start_date, end_date)
+    if bounds is None:
+        return []
+    start, end = bounds
+
+    first, stop = _whole_buckets(start, end, granularity)
+    if first < stop:
+        segments = [(granularity, first, stop)]
+        edges = []
+        if start < first:
+            edges.append(("day", start, first))
+        if stop <= end:
+            edges.append(("day", stop, end + ONE_DAY))
+    else:
+        segments = []
+        edges = [("day", start, end + ONE_DAY)]
+
+    totals = defaultdict(lambda: [0.0, 0])
+    for part in (segments, edges):
+        if not part:
+            continue
+        rows = db.execute(
+            select(
+                Rollup.bucket, *columns, func.sum(Rollup.total), func.sum(Rollup.count)
+            )
+            .where(_segment_filter(part))
+            .group_by(Rollup.bucket, *columns)
+        )
+        for bucket, *key, total, count in rows:
+            entry = totals[(bucket_start(bucket, granularity), *key)]
+            entry[0] += total
+            entry[1] += count
+
+    return [(*key, total, count) for key, (total, count) in sorted(totals.items())]
+
+
+def apply_rollup_deltas(db, changes):
+    """Add transaction changes to the rollups in the current transaction.
+
+    ``changes`` are (date, type, category, amount, count) tuples: a new row
+    counts as (+amount, +1) and a removed one as (-amount, -1). Buckets
+    left without transactions are deleted.
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+    for value, type, category, amount, count in changes:
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(value, granularity), type, category)
+            deltas[key][0] += amount
+            deltas[key][1] += count
+    if not deltas:
+        return
+
+    values = [
+        {
+            "granularity": granularity,
+            "bucket": bucket,
+            "type": type,
+            "category": category,
+            "total": total,
+            "count": count,
+        }
+        for (granularity, bucket, type, category), (total, count) in deltas.items()
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        upsert = (sqlite if dialect == "sqlite" else postgresql).insert(Rollup)
+        db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=["granularity", "bucket", "type", "category"],
+                set_={
+                    "total": Rollup.total + upsert.excluded.total,
+                    "count": Rollup.count + upsert.excluded.count,
+                },
+            ),
+            values,
+        )
+    else:
+        for row in values:
+            rollup = db.get(
+                Rollup,
+                (row["granularity"], row["bucket"], row["type"], row["category"]),
+            )
+            if rollup is None:
+                db.add(Rollup(**row))
+            else:
+                rollup.total += row["total"]
+                rollup.count += row["count"]
+        db.flush()
+
+    for (granularity, bucket, type, category), (_, count) in deltas.items():
+        if count < 0:
+            db.execute(
+                delete(Rollup).where(
+                    Rollup.granularity == granularity,
+                    Rollup.bucket == bucket,
+                    Rollup.type == type,
+                    Rollup.category == category,
+                    Rollup.count <= 0,
+                )
+            )
+
+
+def rebuild_rollups(db):
+    """Recompute every rollup from the transactions table.
+
+    The transactions are first grouped per day, type and category in the
+    database, so only those groups pass through Python. Claims a new data
+    version with every month marked as changed, so no ETag or cached
+    aggregate from before the rebuild is served afterwards. Doesn't commit.
+    """
+    months = list(
+        db.execute(select(Rollup.bucket).where(Rollup.granularity == "month")).scalars()
+    )
+    db.execute(delete(Rollup))
+    groups = db.execute(
+        select(
+            Transaction.date,
+            Transaction.type,
+            Transaction.category,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id),
+        ).group_by(Transaction.date, Transaction.type, Transaction.category)
+    ).all()
+    apply_rollup_deltas(db, groups)
+    next_data_version(db, months + [group[0] for group in groups])
+    logger.info(f"Rebuilt rollups from {len(groups)} daily groups")
+    return len(groups)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the DashBorges rollup tables")
+    parser.add_argument(
+        "command", choices=["rebuild"], help="rebuild: recompute all rollups"
+    )
+    parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db)
+        db.commit()
+    finally:
+        db.close()
@@ -4,10 +4,38 @@ from datetime import datetime
 from data_handler import (
     load_csv_data,
     add_transaction,
-    update_transaction,
-    delete_transaction,
+    apply_transaction_changes,
+    get_transaction_page,
 )
 
+CATEGORIES = [
+    "Salary",
+    "Investments",
+    "Gifts",
+    "Other Income",
+    "Housing",
+    "Food",
+    "Transportation",
+    "Utilities",
+    "Entertainment",
+    "Healthcare",
+    "Shopping",
+    "Other Expenses",
+]
+
+# Sort orders offered by the transaction table, as API sort parameters
+TABLE_SORTS = {
+    "Newest first": "-date",
+    "Oldest first": "date",
+    "Largest amount": "-amount",
+    "Smallest amount": "amount",
+    "Category": "category",
+}
+
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
+
+EDITABLE_COLUMNS = ["date", "category", "description", "amount", "type"]
+
 
 def create_sidebar():
     """Create the sidebar UI for data management."""
@@ -29,23 +57,7 @@ def create_sidebar():
             col1, col2 = st.columns(2)
             with col1:
                 date = st.date_input("Date", datetime.now())
-                category = st.selectbox(
-                    "Category",
-                    [
-                        "Salary",
-                        "Investments",
-                        "Gifts",
-                        "Other Income",
-                        "Housing",
-                        "Food",
-                        "Transportation",
-                        "Utilities",
-                        "Entertainment",
-                        "Healthcare",
-                        "Shopping",
-                        "Other Expenses",
-                    ],
-                )
+                category = st.selectbox("Category", CATEGORIES)
             with col2:
                 description = st.text_input("Description")
                 amount = st.number_input("Amount", min_value=0.0, step=0.01)
@@ -59,12 +71,28 @@ def create_sidebar():
                     st.success("Transaction added successfully!")
 
 
-def display_financial_summary(period_name, total_income, total_expenses, balance):
-    """Display financial summary metrics."""
+def display_financial_summary(
+    period_name, total_income, total_expenses, balance, previous=None
+):
+    """Display financial summary metrics.
+
+    ``previous`` holds the (income, expenses, balance) of the same period a
+    year earlier; when given, income and expenses show the change from it.
+    """
+    income_delta = expenses_delta = ""
+    if previous is not None:
+        income_delta = f"{total_income - previous[0]:+,.2f} vs last year"
+        expenses_delta = f"{total_expenses - previous[1]:+,.2f} vs last year"
+
     st.subheader(f"Financial Summary ({period_name})")
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Income", f"${total_income:,.2f}", "")
-    col2.metric("Total Expenses", f"${total_expenses:,.2f}", "")
+    col1.metric("Total Income", f"${total_income:,.2f}", income_delta)
+    col2.metric(
+        "Total Expenses",
+        f"${total_expenses:,.2f}",
+        expenses_delta,
+        delta_color="inverse",
+    )
     col3.metric(
         "Balance",
         f"${balance:,.2f}",
@@ -72,189 +100,159 @@ def display_financial_summary(period_name, total_income, total_expenses, balance
     )
 
 
-def display_transaction_table(filtered_df):
-    """Display transaction table with edit and delete capabilities."""
+def display_transaction_table(start_date, end_date):
+    """Display the transactions in a date range, one page at a time.
+
+    Only the visible page is fetched and rendered, so a rerun costs the
+    same however many transactions the range holds. Edits and deletes made
+    in the table are collected across pages and submitted as one batch.
+    """
     st.subheader("Recent Transactions")
 
     # Create tabs for different views
     tab1, tab2 = st.tabs(["Recent Transactions", "All Transactions"])
 
-    # Check if we have transactions to display
-    if filtered_df.empty:
+    recent, total = get_transaction_page(start_date, end_date, 0, 10)
+    if not total:
         st.info("No transactions available for the selected time period.")
         return
 
-    # Ensure transactions have an ID column
-    if "id" not in filtered_df.columns:
-        filtered_df = filtered_df.reset_index().rename(columns={"index": "id"})
-
-    # Sort by date, most recent first
-    display_df = filtered_df.sort_values("date", ascending=False)
-
     with tab1:
-        # Show only the 10 most recent transactions (recent view prefix)
-        _display_interactive_table(display_df.head(10), key_prefix="recent")
+        st.dataframe(
+            recent[EDITABLE_COLUMNS],
+            column_config=_column_config(recent),
+            hide_index=True,
+            use_container_width=True,
+        )
 
     with tab2:
-        # Show all transactions (all view prefix)
-        _display_interactive_table(display_df, key_prefix="all")
-
-    # Show edit form once in sidebar if editing
-    if "edit_transaction" in st.session_state:
-        _display_edit_form(st.session_state["edit_transaction"])
-
-
-def _display_interactive_table(df, key_prefix=""):
-    """Display an interactive transaction table with edit and delete buttons."""
-    # Create a unique key for each transaction row
-    for idx, (i, row) in enumerate(df.iterrows()):
-        with st.container():
-            col1, col2, col3, col4, col5, col6 = st.columns([1, 1, 2, 1, 0.5, 0.5])
-
-            # Format date for display
-            date_str = (
-                row["date"].strftime("%Y-%m-%d")
-                if hasattr(row["date"], "strftime")
-                else row["date"]
-            )
-
-            # Display transaction info
-            col1.write(date_str)
-            col2.write(row["category"])
-            col3.write(row["description"])
-
-            # Format amount and use appropriate color based on transaction type
-            amount_text = f"${row['amount']:.2f}"
-            color = "#008000" if row["type"] == "income" else "#FF0000"
-            col4.markdown(
-                f"<span style='color:{color}'>{amount_text}</span>",
-                unsafe_allow_html=True,
-            )
-
-            # Build unique keys using prefix and row ID to avoid duplicates across tables
-            # key_prefix differentiates between recent and all views
-            prefix = f"{key_prefix}_" if key_prefix else ""
-            edit_key = f"{prefix}edit_{i}"
-            delete_key = f"{prefix}delete_{i}"
-
-            # Edit button with unique key
-            if col5.button("✏️", key=edit_key):
-                st.session_state["edit_transaction"] = row.to_dict()
-
-            # Delete button with unique key
-            if col6.button("🗑️", key=delete_key):
-                if delete_transaction(row["id"]):
-                    st.success("Transaction deleted successfully!")
-                else:
-                    st.error("Failed to delete transaction.")
-
-        # Add a light separator between rows
-        st.markdown(
-            "<hr style='margin: 0; padding: 0; height: 1px'>", unsafe_allow_html=True
-        )
+        _display_paged_editor(start_date, end_date, total)
+
+
+def _column_config(page):
+    categories = sorted(set(CATEGORIES) | set(page["category"].dropna()))
+    return {
+        "id": st.column_config.NumberColumn("ID", disabled=True),
+        "date": st.column_config.DateColumn(
+            "Date", format="YYYY-MM-DD", required=True
+        ),
+        "category": st.column_config.SelectboxColumn(
+            "Category", options=categories, required=True
+        ),
+        "description": st.column_config.TextColumn("Description"),
+        "amount": st.column_config.NumberColumn(
+            "Amount", min_value=0.0, step=0.01, format="$%.2f", required=True
+        ),
+        "type": st.column_config.SelectboxColumn(
+            "Type", options=["income", "expense"], required=True
+        ),
+        "delete": st.column_config.CheckboxColumn("Delete"),
+    }
+
+
+def _pending_changes():
+    return st.session_state.setdefault(
+        "table_changes", {"updates": {}, "deletes": set(), "bases": {}}
+    )
 
 
-def _display_edit_form(transaction):
-    """Display form for editing a transaction."""
-    st.sidebar.header("Edit Transaction")
+def _display_paged_editor(start_date, end_date, total):
+    """Editable table of one page, sorted and sliced by the API."""
+    if "table_message" in st.session_state:
+        level, message = st.session_state.pop("table_message")
+        getattr(st, level)(message)
 
-    with st.sidebar.form("edit_transaction_form"):
-        # Format date for the date input
-        if isinstance(transaction["date"], str):
-            try:
-                date_val = datetime.strptime(transaction["date"], "%Y-%m-%d").date()
-            except ValueError:
-                date_val = datetime.now().date()
-        else:
-            date_val = (
-                transaction["date"]
-                if hasattr(transaction["date"], "date")
-                else datetime.now().date()
-            )
-
-        # Create the form fields
-        date = st.date_input("Date", value=date_val)
-
-        category = st.selectbox(
-            "Category",
-            [
-                "Salary",
-                "Investments",
-                "Gifts",
-                "Other Income",
-                "Housing",
-                "Food",
-                "Transportation",
-                "Utilities",
-                "Entertainment",
-                "Healthcare",
-                "Shopping",
-                "Other Expenses",
-            ],
-            index=[
-                "Salary",
-                "Investments",
-                "Gifts",
-                "Other Income",
-                "Housing",
-                "Food",
-                "Transportation",
-                "Utilities",
-                "Entertainment",
-                "Healthcare",
-                "Shopping",
-                "Other Expenses",
-            ].index(transaction["category"])
-            if transaction["category"]
-            in [
-                "Salary",
-                "Investments",
-                "Gifts",
-                "Other Income",
-                "Housing",
-                "Food",
-                "Transportation",
-                "Utilities",
-                "Entertainment",
-                "Healthcare",
-                "Shopping",
-                "Other Expenses",
-            ]
-            else 0,
-        )
+    col1, col2, col3 = st.columns(3)
+    sort = TABLE_SORTS[col1.selectbox("Sort by", list(TABLE_SORTS), key="table_sort")]
+    page_size = col2.selectbox("Rows per page", TABLE_PAGE_SIZES, key="table_page_size")
+    pages = -(-total // page_size)
+    if st.session_state.get("table_page", 1) > pages:
+        st.session_state["table_page"] = pages
+    page = col3.number_input(
+        "Page", min_value=1, max_value=pages, step=1, key="table_page"
+    )
+    st.caption(f"{total:,} transactions, page {page} of {pages}")
 
-        description = st.text_input("Description", value=transaction["description"])
-        amount = st.number_input(
-            "Amount", min_value=0.0, step=0.01, value=float(transaction["amount"])
-        )
+    rows, _ = get_transaction_page(start_date, end_date, page - 1, page_size, sort)
+    original = rows[["id", *EDITABLE_COLUMNS]].reset_index(drop=True)
+    original["date"] = original["date"].dt.date
 
-        trans_type = st.radio(
-            "Type",
-            ["Income", "Expense"],
-            index=0 if transaction["type"].lower() == "income" else 1,
-            horizontal=True,
-        )
+    changes = _pending_changes()
+    generation = st.session_state.get("table_generation", 0)
+    editor_key = (
+        f"table_editor_{generation}_{start_date}_{end_date}_{sort}_{page_size}_{page}"
+    )
+    # The editor's input must stay the same while it is on screen, so the
+    # page is shown with the pending changes as they were when it opened
+    if editor_key not in st.session_state or editor_key not in changes["bases"]:
+        base = original.copy()
+        for position, transaction_id in enumerate(base["id"]):
+            update = changes["updates"].get(transaction_id)
+            if update is not None:
+                for column in EDITABLE_COLUMNS:
+                    base.at[position, column] = update[column]
+        base["delete"] = base["id"].isin(changes["deletes"])
+        changes["bases"] = {editor_key: base}
+    edited = st.data_editor(
+        changes["bases"][editor_key],
+        column_config=_column_config(original),
+        disabled=["id"],
+        hide_index=True,
+        num_rows="fixed",
+        use_container_width=True,
+        key=editor_key,
+    )
 
-        col1, col2 = st.columns(2)
-
-        # Submit button
-        submit = col1.form_submit_button("Update")
-        if submit:
-            if update_transaction(
-                transaction["id"],
-                date,
-                category,
-                description,
-                amount,
-                trans_type.lower(),
-            ):
-                st.success("Transaction updated successfully!")
-                # Clear the edit state and refresh
-                del st.session_state["edit_transaction"]
-            else:
-                st.error("Failed to update transaction.")
+    for (_, before), (_, after) in zip(original.iterrows(), edited.iterrows()):
+        transaction_id = before["id"]
+        changes["updates"].pop(transaction_id, None)
+        changes["deletes"].discard(transaction_id)
+        if after["delete"]:
+            changes["deletes"].add(transaction_id)
+        elif _row_changed(before, after):
+            changes["updates"][transaction_id] = {
+                column: after[column] for column in EDITABLE_COLUMNS
+            }
+
+    if not (changes["updates"] or changes["deletes"]):
+        return
 
-        # Cancel button
-        cancel = col2.form_submit_button("Cancel")
-        if cancel:
-            del st.session_state["edit_transaction"]
+    col1, col2, col3 = st.columns([2, 1, 1])
+    col1.write(
+        f"{len(changes['updates'])} edited, "
+        f"{len(changes['deletes'])} marked for deletion"
+    )
+    if col2.button("Apply changes", type="primary"):
+        report = apply_transaction_changes(
+            [{"id": i, **row} for i, row in changes["updates"].items()],
+            sorted(changes["deletes"]),
+        )
+        problems = report["conflict"] + report["invalid"]
+        if problems:
+            message = ("warning", f"{problems} changes couldn't be applied.")
+        elif report["queued"]:
+            message = ("info", f"{report['queued']} changes saved for the next sync.")
+        else:
+            message = ("success", f"{report['applied']} changes applied.")
+        st.session_state["table_message"] = message
+        _reset_table()
+    if col3.button("Discard changes"):
+        _reset_table()
+
+
+def _row_changed(before, after):
+    for column in EDITABLE_COLUMNS:
+        if pd.isna(before[column]) and pd.isna(after[column]):
+            continue
+        if before[column] != after[column]:
+            return True
+    return False
+
+
+def _reset_table():
+    """Drop the pending changes and reopen the table on fresh data."""
+    st.session_state.pop("table_changes", None)
+    st.session_state["table_generation"] = (
+        st.session_state.get("table_generation", 0) + 1
+    )
+    st.rerun()
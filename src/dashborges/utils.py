@@ -1,40 +1,169 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import calendar
+import numpy as np
 import pandas as pd
 
 
-def calculate_summary(df):
-    """Calculate financial summary statistics."""
-    if df.empty:
-        return 0, 0, 0
+class LedgerIndex:
+    """Date-sorted prefix sums over a transactions DataFrame.
+
+    Built once per version of the ledger, it answers the totals of any date
+    window with two binary searches instead of masking every row, and hands
+    out the window's rows as a slice of the sorted frame.
+    """
+
+    def __init__(self, df):
+        self.source = df
+        self.frame = df.assign(date=pd.to_datetime(df["date"])).sort_values(
+            "date", kind="stable", ignore_index=True
+        )
+        self.dates = self.frame["date"].to_numpy().astype("datetime64[D]")
+
+        amounts = self.frame["amount"].to_numpy(dtype=float)
+        types = self.frame["type"].to_numpy()
+        # Cumulative sums with a leading zero: the total of rows [lo, hi)
+        # is cum[hi] - cum[lo]
+        self.income = np.concatenate(
+            ([0.0], np.cumsum(np.where(types == "income", amounts, 0.0)))
+        )
+        self.expenses = np.concatenate(
+            ([0.0], np.cumsum(np.where(types == "expense", amounts, 0.0)))
+        )
+
+    def __len__(self):
+        return len(self.dates)
+
+    def bounds(self, start_date=None, end_date=None):
+        """Positions [lo, hi) of the rows dated within an inclusive range."""
+        lo = 0
+        hi = len(self.dates)
+        if start_date is not None:
+            lo = self.dates.searchsorted(np.datetime64(start_date, "D"), "left")
+        if end_date is not None:
+            hi = self.dates.searchsorted(np.datetime64(end_date, "D"), "right")
+        return lo, max(lo, hi)
 
-    total_income = df[df["type"] == "income"]["amount"].sum()
-    total_expenses = df[df["type"] == "expense"]["amount"].sum()
-    balance = total_income - total_expenses
+    def summary(self, start_date=None, end_date=None):
+        """Return (total_income, total_expenses, balance) for a date range."""
+        lo, hi = self.bounds(start_date, end_date)
+        income = self.income[hi] - self.income[lo]
+        expenses = self.expenses[hi] - self.expenses[lo]
+        return income, expenses, income - expenses
 
-    return total_income, total_expenses, balance
+    def rows(self, start_date=None, end_date=None):
+        """Transactions dated within a range, sorted by date."""
+        lo, hi = self.bounds(start_date, end_date)
+        return self.frame.iloc[lo:hi]
 
 
-def filter_data_by_time(df, time_filter):
-    """Filter transaction data by time period."""
-    # Ensure date is datetime
-    if not pd.api.types.is_datetime64_any_dtype(df["date"]):
-        df["date"] = pd.to_datetime(df["date"])
+TIME_FILTERS = ["All Time", "Last 30 Days", "This Month", "This Quarter", "This Year"]
 
+
+def get_time_window(time_filter):
+    """Return (start_date, end_date, period_name) for a time period filter.
+
+    The dates are None for an open end.
+    """
+    today = datetime.now().date()
+    if time_filter == "Last 30 Days":
+        return today - timedelta(days=29), today, "Last 30 Days"
     if time_filter == "This Month":
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        filtered_df = df[
-            (df["date"].dt.month == current_month)
-            & (df["date"].dt.year == current_year)
-        ]
-        period_name = f"{calendar.month_name[current_month]} {current_year}"
-    elif time_filter == "This Year":
-        current_year = datetime.now().year
-        filtered_df = df[df["date"].dt.year == current_year]
-        period_name = f"{current_year}"
-    else:
-        filtered_df = df
-        period_name = "All Time"
-
-    return filtered_df, period_name
+        start = today.replace(day=1)
+        end = today.replace(day=calendar.monthrange(today.year, today.month)[1])
+        return start, end, f"{calendar.month_name[today.month]} {today.year}"
+    if time_filter == "This Quarter":
+        quarter = (today.month - 1) // 3
+        start = today.replace(month=quarter * 3 + 1, day=1)
+        end_month = quarter * 3 + 3
+        end = today.replace(
+            month=end_month, day=calendar.monthrange(today.year, end_month)[1]
+        )
+        return start, end, f"Q{quarter + 1} {today.year}"
+    if time_filter == "This Year":
+        return (
+            today.replace(month=1, day=1),
+            today.replace(month=12, day=31),
+            str(today.year),
+        )
+    return None, None, "All Time"
+
+
+def year_earlier(value):
+    """The same day a year before, Feb 29 falling back to Feb 28."""
+    try:
+        return value.replace(year=value.year - 1)
+    except ValueError:
+        return value.replace(year=value.year - 1, day=28)
+
+
+def monthly_totals(df):
+    """Income, expenses and balance per month, shaped like /analytics/monthly."""
+    if df.empty:
+        return pd.DataFrame(columns=["month", "income", "expenses", "balance"])
+    totals = (
+        df.groupby([df["date"].dt.strftime("%Y-%m"), "type"])["amount"]
+        .sum()
+        .unstack(fill_value=0)
+    )
+    monthly = pd.DataFrame(
+        {
+            "month": totals.index,
+            "income": totals.get("income", 0),
+            "expenses": totals.get("expense", 0),
+        }
+    ).reset_index(drop=True)
+    monthly["balance"] = monthly["income"] - monthly["expenses"]
+    return monthly
+
+
+def category_totals(df, type="expense"):
+    """Totals per category of one type, shaped like /analytics/categories."""
+    rows = df[df["type"] == type]
+    totals = rows.groupby("category")["amount"].agg(["sum", "count"]).reset_index()
+    totals.columns = ["category", "total", "count"]
+    return totals.sort_values("total", ascending=False, ignore_index=True)
+
+
+def balance_series(df):
+    """Daily net and running balance, shaped like /analytics/balance-series."""
+    signed = np.where(df["type"] == "expense", -df["amount"], df["amount"])
+    daily = (
+        pd.Series(signed, index=df["date"].values, dtype=float).groupby(level=0).sum()
+    )
+    return pd.DataFrame(
+        {"date": daily.index, "net": daily.values, "balance": daily.cumsum().values}
+    )
+
+
+def lttb_indices(x, y, threshold):
+    """Positions of the points Largest-Triangle-Three-Buckets keeps.
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    equal buckets in between, the point forming the largest triangle with
+    the point kept before it and the average of the next bucket, so peaks
+    and troughs survive the downsampling. ``x`` must be sorted.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    kept = np.empty(threshold, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket, or the last point after the final one
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+        )
+        previous = lo + int(areas.argmax())
+        kept[i + 1] = previous
+    return kept
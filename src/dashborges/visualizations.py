@@ -1,52 +1,88 @@
+import os
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
-
-
-def create_income_expense_chart(filtered_df):
-    """Create income vs expenses chart."""
-    if not filtered_df.empty:
-        monthly_data = filtered_df.copy()
-        monthly_data["month_year"] = monthly_data["date"].dt.strftime("%Y-%m")
-        monthly_summary = (
-            monthly_data.groupby(["month_year", "type"])["amount"]
-            .sum()
-            .unstack()
-            .fillna(0)
+from utils import lttb_indices
+
+# Most points a time-series trace is drawn with; longer series are
+# downsampled so the figure sent to the browser stays the same size
+CHART_POINT_BUDGET = int(os.environ.get("DASHBORGES_CHART_POINTS", "1000"))
+
+# Traces with more points than this are drawn with WebGL
+WEBGL_THRESHOLD = int(os.environ.get("DASHBORGES_WEBGL_THRESHOLD", "500"))
+
+
+def _line_trace(x, y, **kwargs):
+    """Line trace for a long series: WebGL and no markers past a threshold."""
+    if len(x) > WEBGL_THRESHOLD:
+        return go.Scattergl(x=x, y=y, mode="lines", **kwargs)
+    return go.Scatter(x=x, y=y, mode="lines+markers", **kwargs)
+
+
+def _downsample(frame, x, y, max_points):
+    """Rows of a series kept by LTTB to fit a point budget."""
+    if len(frame) <= max_points:
+        return frame
+    positions = frame[x]
+    if hasattr(positions, "dt"):
+        positions = positions.astype("int64")
+    return frame.iloc[
+        lttb_indices(positions.to_numpy(), frame[y].to_numpy(), max_points)
+    ]
+
+
+def _coarsen_months(monthly, max_bars):
+    """Merge runs of consecutive months so at most ``max_bars`` remain.
+
+    Totals are summed, so bars still add up to the period; each merged
+    bar is labelled with its first month.
+    """
+    size = -(-len(monthly) // max_bars)
+    if size <= 1:
+        return monthly, "Month"
+    monthly = monthly.reset_index(drop=True)
+    merged = monthly.groupby(monthly.index // size).agg(
+        month=("month", "first"),
+        income=("income", "sum"),
+        expenses=("expenses", "sum"),
+        balance=("balance", "sum"),
+    )
+    return merged, f"Period ({size} months)"
+
+
+def create_income_expense_chart(monthly, max_points=None):
+    """Create income vs expenses chart.
+
+    Takes the per-month totals from /analytics/monthly (or
+    ``utils.monthly_totals``): month, income, expenses and balance. Long
+    histories are drawn with multi-month bars, at most a third of
+    ``max_points`` (default ``CHART_POINT_BUDGET``) per series.
+    """
+    if not monthly.empty:
+        monthly, x_title = _coarsen_months(
+            monthly, max(1, (max_points or CHART_POINT_BUDGET) // 3)
         )
-
-        if "income" not in monthly_summary.columns:
-            monthly_summary["income"] = 0
-        if "expense" not in monthly_summary.columns:
-            monthly_summary["expense"] = 0
-
-        monthly_summary["balance"] = (
-            monthly_summary["income"] - monthly_summary["expense"]
-        )
-
         fig = go.Figure()
         fig.add_trace(
             go.Bar(
-                x=monthly_summary.index,
-                y=monthly_summary["income"],
+                x=monthly["month"],
+                y=monthly["income"],
                 name="Income",
                 marker_color="green",
             )
         )
         fig.add_trace(
             go.Bar(
-                x=monthly_summary.index,
-                y=monthly_summary["expense"],
+                x=monthly["month"],
+                y=monthly["expenses"],
                 name="Expenses",
                 marker_color="red",
             )
         )
         fig.add_trace(
-            go.Scatter(
-                x=monthly_summary.index,
-                y=monthly_summary["balance"],
+            _line_trace(
+                monthly["month"],
+                monthly["balance"],
                 name="Balance",
                 line=dict(color="blue", width=2),
             )
@@ -54,7 +90,7 @@ def create_income_expense_chart(filtered_df):
 
         fig.update_layout(
             barmode="group",
-            xaxis_title="Month",
+            xaxis_title=x_title,
             yaxis_title="Amount ($)",
             legend_title="Type",
             height=400,
@@ -65,17 +101,16 @@ def create_income_expense_chart(filtered_df):
         st.info("No data available for the selected time period")
 
 
-def create_expense_category_chart(filtered_df):
-    """Create expense categories pie chart."""
-    if not filtered_df.empty and "expense" in filtered_df["type"].values:
-        expense_df = filtered_df[filtered_df["type"] == "expense"]
-        expense_by_category = (
-            expense_df.groupby("category")["amount"].sum().reset_index()
-        )
+def create_expense_category_chart(categories):
+    """Create expense categories pie chart.
 
+    Takes the expense totals per category from /analytics/categories (or
+    ``utils.category_totals``).
+    """
+    if not categories.empty:
         fig = px.pie(
-            expense_by_category,
-            values="amount",
+            categories,
+            values="total",
             names="category",
             title="Expense Distribution by Category",
             hole=0.4,
@@ -90,29 +125,32 @@ def create_expense_category_chart(filtered_df):
         st.info("No expense data available for the selected time period")
 
 
-def create_balance_trend_chart(filtered_df):
-    """Create balance trend chart."""
-    if not filtered_df.empty:
-        # Create daily balance data
-        filtered_df = filtered_df.sort_values("date")
-        daily_data = filtered_df.copy()
-        daily_data["amount_signed"] = np.where(
-            daily_data["type"] == "expense", -daily_data["amount"], daily_data["amount"]
-        )
-        daily_data = daily_data.groupby("date")["amount_signed"].sum().reset_index()
-        daily_data["cumulative_balance"] = daily_data["amount_signed"].cumsum()
+def create_balance_trend_chart(daily_data, max_points=None):
+    """Create balance trend chart.
 
-        fig = px.line(
-            daily_data,
-            x="date",
-            y="cumulative_balance",
+    Takes the daily running balance from /analytics/balance-series (or
+    ``utils.balance_series``), downsampled with LTTB to at most
+    ``max_points`` (default ``CHART_POINT_BUDGET``).
+    """
+    if not daily_data.empty:
+        series = _downsample(
+            daily_data, "date", "balance", max_points or CHART_POINT_BUDGET
+        )
+        fig = go.Figure(
+            _line_trace(
+                series["date"],
+                series["balance"],
+                name="Balance",
+                line=dict(color="royalblue", width=2),
+            )
+        )
+        fig.update_layout(
             title="Balance Over Time",
-            markers=True,
+            xaxis_title="Date",
+            yaxis_title="Balance ($)",
+            height=400,
         )
 
-        fig.update_traces(line=dict(color="royalblue", width=2))
-        fig.update_layout(xaxis_title="Date", yaxis_title="Balance ($)", height=400)
-
         # Add a horizontal line at y=0
         fig.add_shape(
             type="line",
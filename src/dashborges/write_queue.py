@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitWriter:
+    """Single writer thread that commits queued mutations in groups.
+
+    Callers submit a function taking a sync Session. The writer waits up to
+    ``window`` seconds for more work after the first mutation arrives, runs
+    the whole group in one transaction (each mutation in its own SAVEPOINT so
+    a failing one doesn't affect the rest) and commits once, paying a single
+    fsync for the group. Every caller still gets its own result or exception.
+    """
+
+    def __init__(self, session_factory, window=0.005, max_batch=256):
+        self._session_factory = session_factory
+        self._window = window
+        self._max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="dashborges-group-commit", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, fn, *args):
+        """Queue a mutation and return a Future for its result."""
+        future = Future()
+        self._queue.put((future, fn, args))
+        return future
+
+    async def run(self, fn, *args):
+        """Queue a mutation and wait for it without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def close(self):
+        """Commit whatever is queued and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+
+    def _begin(self, db):
+        """Open the group's transaction before its first SAVEPOINT.
+
+        pysqlite only begins a transaction implicitly before DML, so a
+        SAVEPOINT sent first would open one of its own and each RELEASE
+        would commit a single mutation. BEGIN IMMEDIATE also takes the write
+        lock up front instead of upgrading a read lock mid-group.
+        """
+        if db.get_bind().dialect.name == "sqlite":
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
+    def _commit(self, batch):
+        db = self._session_factory()
+        results = []
+        try:
+            self._begin(db)
+            for future, fn, args in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db.begin_nested():
+                        results.append((future, fn(db, *args)))
+                except Exception as e:
+                    future.set_exception(e)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Group commit of {len(batch)} mutations failed: {e}")
+            db.rollback()
+            for future, _ in results:
+                future.set_exception(e)
+            return
+        finally:
+            db.close()
+
+        for future, result in results:
+            future.set_result(result)
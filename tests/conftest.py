@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The database module creates its directories and engine on import, so point
+# them somewhere disposable before any test imports it
+_scratch = tempfile.mkdtemp(prefix="dashborges-tests-")
+for name in ("DATA_DIR", "CONFIG_DIR", "LOGS_DIR"):
+    os.environ.setdefault(f"DASHBORGES_{name}", os.path.join(_scratch, name.lower()))
+os.environ.setdefault("DASHBORGES_BACKUP_INTERVAL", "0")
+
+# The dashboard modules import each other as top-level modules, the way
+# Streamlit runs them from their own directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "dashborges"))
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Session on a fresh, fully migrated SQLite database."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from src.dashborges.database import Base, migrate
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'dashborges.db'}")
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
@@ -0,0 +1,118 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import api_client
+from src.dashborges import api
+from src.dashborges.database import Transaction, get_db
+
+
+def _client(tmp_path, monkeypatch, online):
+    monkeypatch.setattr(api_client, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(api_client, "UPLOAD_BACKOFF", 0)
+    monkeypatch.setattr(
+        api_client.DashBorgesClient, "_probe_health", lambda self: online
+    )
+    client = api_client.DashBorgesClient("http://127.0.0.1:9")
+    if not online:
+        client.is_api_available = False
+    return client
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    client = _client(tmp_path, monkeypatch, online=True)
+    yield client
+    client.local_store.close()
+
+
+@pytest.fixture
+def offline_client(tmp_path, monkeypatch):
+    client = _client(tmp_path, monkeypatch, online=False)
+    yield client
+    client.local_store.close()
+
+
+@pytest.fixture
+def server(client, db):
+    """Route the client's requests to the API app, on the test database."""
+    api.app.dependency_overrides[get_db] = lambda: db
+    http = TestClient(api.app)
+    client._request = lambda method, path, **kwargs: http.request(
+        method, path, json=kwargs.get("json")
+    )
+    yield
+    api.app.dependency_overrides.clear()
+
+
+def _offline_rows(client, count):
+    client.local_store.add_many(
+        {
+            "date": date(2024, 1, day),
+            "category": "Food",
+            "description": "",
+            "amount": float(day),
+            "type": "expense",
+        }
+        for day in range(1, count + 1)
+    )
+
+
+def test_oversized_sync_batch_is_split(client, server, db, monkeypatch):
+    monkeypatch.setattr(api, "SYNC_MAX_BATCH", 2)
+    _offline_rows(client, 3)
+
+    report = client.sync()
+
+    assert report == {"applied": 3, "conflict": 0, "invalid": 0, "pending": 0}
+    assert db.query(Transaction).count() == 3
+
+
+@pytest.mark.parametrize("status", [401, 404, 408])
+def test_refused_sync_batch_stays_queued(client, status):
+    response = type("Response", (), {"status_code": status})()
+    client._request = lambda method, path, **kwargs: response
+    _offline_rows(client, 3)
+
+    report = client.sync()
+
+    assert report["pending"] == 3
+    assert client.local_store.pending_count() == 3
+
+
+def test_offline_bulk_upload_skips_invalid_rows(offline_client):
+    client = offline_client
+    df = pd.DataFrame(
+        {
+            "date": ["2024-01-01", "not a date", "2024-01-03", "2024-01-04"],
+            "category": ["Food", "Food", None, "Rent"],
+            "description": ["", "", "", None],
+            "amount": [1.0, 2.0, 3.0, 4.0],
+            "type": ["expense", "expense", "expense", "Expense"],
+        }
+    )
+
+    report = client.bulk_upload_transactions(df)
+
+    assert report == {"created": 0, "rejected": 2, "queued": 2, "unknown": 0}
+    stored = client.local_store.query()
+    assert stored["amount"].tolist() == [1.0, 4.0]
+    assert stored["type"].tolist() == ["expense", "expense"]
+
+
+def test_offline_bulk_upload_reports_a_failed_store(offline_client):
+    client = offline_client
+    client.local_store.close()
+    df = pd.DataFrame(
+        {
+            "date": ["2024-01-01"],
+            "category": ["Food"],
+            "description": [""],
+            "amount": [1.0],
+            "type": ["expense"],
+        }
+    )
+
+    assert client.bulk_upload_transactions(df) is None
@@ -0,0 +1,42 @@
+import os
+import sqlite3
+from datetime import datetime
+
+from src.dashborges.backup import BackupScheduler, list_snapshots, prune_snapshots
+
+
+def _touch(backup_dir, taken, digest):
+    path = os.path.join(backup_dir, f"db_{taken:%Y%m%dT%H%M%S}_{digest}.db")
+    open(path, "w").close()
+    return path
+
+
+def test_newest_snapshots_survive_their_hourly_bucket(tmp_path):
+    scheduled = _touch(tmp_path, datetime(2024, 1, 1, 10, 0), "a")
+    manual = _touch(tmp_path, datetime(2024, 1, 1, 10, 20), "b")
+    older = _touch(tmp_path, datetime(2024, 1, 1, 9, 0), "c")
+    same_hour = _touch(tmp_path, datetime(2024, 1, 1, 9, 30), "d")
+
+    removed = prune_snapshots(tmp_path, "db", {"latest": 2, "hourly": 24})
+
+    assert removed == [older]
+    assert [path for _, _, path in list_snapshots(tmp_path, "db")] == [
+        manual,
+        scheduled,
+        same_hour,
+    ]
+
+
+def test_scheduler_snapshots_on_start(tmp_path):
+    source = tmp_path / "source.db"
+    with sqlite3.connect(source) as connection:
+        connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+    connection.close()
+
+    backup_dir = tmp_path / "backups"
+    scheduler = BackupScheduler(str(source), str(backup_dir), "source", 3600)
+    scheduler.start()
+    scheduler.stop()
+    scheduler._thread.join(timeout=10)
+
+    assert len(list_snapshots(backup_dir, "source")) == 1
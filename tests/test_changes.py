@@ -0,0 +1,50 @@
+from datetime import date
+
+from src.dashborges import api
+
+
+def _transaction(category, amount=1.0):
+    return api.TransactionCreate(
+        date=date(2024, 1, 1),
+        category=category,
+        description="",
+        amount=amount,
+        type="expense",
+    )
+
+
+def _write(db, fn, *args):
+    result = fn(db, *args)
+    db.commit()
+    return result
+
+
+def test_feed_returns_upserts_and_tombstones_since_a_version(db):
+    kept = _write(db, api._create_transaction, _transaction("Food")).id
+    edited = _write(db, api._create_transaction, _transaction("Rent")).id
+    removed = _write(db, api._create_transaction, _transaction("Fun")).id
+    since = api._read_transaction_changes(db, None).version
+
+    _write(db, api._update_transaction, edited, _transaction("Rent", 2.0))
+    _write(db, api._delete_transaction, removed)
+    added = _write(db, api._create_transaction, _transaction("Travel")).id
+
+    changes = api._read_transaction_changes(db, since)
+    assert changes.version == since + 3
+    assert not changes.reset
+    assert [(t.id, t.amount) for t in changes.upserts] == [(edited, 2.0), (added, 1.0)]
+    assert changes.deleted == [removed]
+    assert kept not in [t.id for t in changes.upserts]
+
+    # Caught up: nothing new, and an unknown future version asks for a reload
+    current = api._read_transaction_changes(db, changes.version)
+    assert (current.upserts, current.deleted, current.reset) == ([], [], False)
+    assert api._read_transaction_changes(db, changes.version + 1).reset
+
+
+def test_feed_asks_for_a_reload_past_max_changes(db, monkeypatch):
+    monkeypatch.setattr(api, "MAX_CHANGES", 2)
+    for category in ("Food", "Rent", "Fun"):
+        _write(db, api._create_transaction, _transaction(category))
+
+    assert api._read_transaction_changes(db, 0).reset
@@ -0,0 +1,47 @@
+import sqlite3
+
+from sqlalchemy import create_engine
+
+from src.dashborges.database import Base, migrate
+
+OLD_SCHEMA = """
+CREATE TABLE transactions (
+    id INTEGER NOT NULL PRIMARY KEY,
+    date DATE NOT NULL,
+    category VARCHAR NOT NULL,
+    description VARCHAR NOT NULL,
+    amount FLOAT NOT NULL,
+    type VARCHAR NOT NULL
+);
+INSERT INTO transactions VALUES
+    (1, '2024-01-01', 'Food', '', 10.0, 'expense'),
+    (2, '2024-01-02', 'Salary', 'January', 100.0, 'income'),
+    (3, '2024-01-03', 'Food', 'Lunch', 5.0, 'expense');
+DELETE FROM transactions WHERE id = 3;
+"""
+
+
+def test_migrate_stops_sqlite_reusing_deleted_ids(tmp_path):
+    path = tmp_path / "old.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript(OLD_SCHEMA)
+
+    engine = create_engine(f"sqlite:///{path}")
+    for _ in range(2):
+        Base.metadata.create_all(bind=engine)
+        migrate(engine)
+    engine.dispose()
+
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute(
+            "SELECT id, description, version FROM transactions ORDER BY id"
+        ).fetchall()
+        assert rows == [(1, "", 0), (2, "January", 0)]
+
+        connection.execute("DELETE FROM transactions WHERE id = 2")
+        connection.execute(
+            "INSERT INTO transactions (date, category, description, amount, type)"
+            " VALUES ('2024-02-01', 'Food', '', 1.0, 'expense')"
+        )
+        new_id = connection.execute("SELECT max(id) FROM transactions").fetchone()[0]
+    assert new_id > 2
@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+
+from src.dashborges import api
+from src.dashborges.database import current_data_version
+from src.dashborges.result_cache import ResultCache
+
+JANUARY = (date(2024, 1, 1), date(2024, 1, 31))
+FEBRUARY = (date(2024, 2, 1), date(2024, 2, 29))
+
+
+@pytest.fixture(autouse=True)
+def result_cache(monkeypatch):
+    cache = ResultCache()
+    monkeypatch.setattr(api, "result_cache", cache)
+    return cache
+
+
+def _add(db, value, amount):
+    api._create_transaction(
+        db,
+        api.TransactionCreate(
+            date=value, category="Food", description="", amount=amount, type="expense"
+        ),
+    )
+    db.commit()
+
+
+def test_write_recomputes_only_the_months_it_touched(db):
+    _add(db, date(2024, 1, 10), 10.0)
+    _add(db, date(2024, 2, 10), 20.0)
+
+    computed = []
+
+    def expenses(db, start_date, end_date):
+        computed.append(start_date)
+        return api._get_summary(db, start_date, end_date, False, False, False)[
+            "total_expenses"
+        ]
+
+    def read(start_date, end_date):
+        version = current_data_version(db)
+        return api._cached_aggregate(db, version, expenses, start_date, end_date)
+
+    assert read(*JANUARY) == 10.0
+    assert read(*FEBRUARY) == 20.0
+    assert read(*JANUARY) == 10.0
+    assert computed == [JANUARY[0], FEBRUARY[0]]
+
+    _add(db, date(2024, 1, 20), 5.0)
+
+    assert read(*JANUARY) == 15.0
+    assert read(*FEBRUARY) == 20.0
+    assert computed == [JANUARY[0], FEBRUARY[0], JANUARY[0]]
+
+    # February's entry was revalidated at the new version, so it is reused
+    # without another look at the changed months
+    assert read(*FEBRUARY) == 20.0
+    assert len(computed) == 3
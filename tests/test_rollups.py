@@ -0,0 +1,129 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from src.dashborges import api
+from src.dashborges.database import (
+    ChangedMonth,
+    Rollup,
+    Transaction,
+    current_data_version,
+)
+from src.dashborges.rollups import cover, range_totals, rebuild_rollups
+
+
+def test_cover_splits_a_range_into_whole_buckets():
+    assert cover(date(2023, 11, 30), date(2025, 2, 2)) == [
+        ("day", date(2023, 11, 30), date(2023, 12, 1)),
+        ("month", date(2023, 12, 1), date(2024, 1, 1)),
+        ("year", date(2024, 1, 1), date(2025, 1, 1)),
+        ("month", date(2025, 1, 1), date(2025, 2, 1)),
+        ("day", date(2025, 2, 1), date(2025, 2, 3)),
+    ]
+    assert cover(date(2024, 3, 5), date(2024, 3, 9)) == [
+        ("day", date(2024, 3, 5), date(2024, 3, 10)),
+    ]
+    assert cover(date(2024, 1, 1), date(2024, 12, 31)) == [
+        ("year", date(2024, 1, 1), date(2025, 1, 1)),
+    ]
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        (date(2023, 11, 30), date(2025, 2, 2)),
+        (date(2024, 2, 28), date(2024, 3, 1)),
+        (date(2024, 1, 1), date(2024, 1, 1)),
+        (date(2023, 12, 31), date(2024, 12, 31)),
+    ],
+)
+def test_cover_selects_every_day_once(start, end):
+    segments = cover(start, end)
+    spans = sorted((first, stop) for _, first, stop in segments)
+    assert spans[0][0] == start
+    assert spans[-1][1] == date.fromordinal(end.toordinal() + 1)
+    for (_, stop), (first, _) in zip(spans, spans[1:]):
+        assert stop == first
+    assert sum((stop - first).days for first, stop in spans) == (end - start).days + 1
+
+
+def _direct_totals(db, start, end):
+    rows = db.execute(
+        select(
+            Transaction.type,
+            Transaction.category,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id),
+        )
+        .where(Transaction.date >= start, Transaction.date <= end)
+        .group_by(Transaction.type, Transaction.category)
+    )
+    return {(type, category): (total, count) for type, category, total, count in rows}
+
+
+def _rollup_totals(db, start, end):
+    rows = range_totals(db, start, end, [Rollup.type, Rollup.category])
+    return {(type, category): (total, count) for type, category, total, count in rows}
+
+
+def _assert_rollups_match(db):
+    for start, end in [
+        (date(2023, 1, 1), date(2025, 12, 31)),
+        (date(2023, 12, 15), date(2024, 2, 10)),
+        (date(2024, 1, 31), date(2024, 1, 31)),
+    ]:
+        expected = _direct_totals(db, start, end)
+        actual = _rollup_totals(db, start, end)
+        assert actual.keys() == expected.keys()
+        for key, (total, count) in expected.items():
+            assert actual[key][0] == pytest.approx(total)
+            assert actual[key][1] == count
+
+
+def _transaction(value, category, amount, type="expense"):
+    return api.TransactionCreate(
+        date=value, category=category, description="", amount=amount, type=type
+    )
+
+
+def test_rollups_follow_creates_updates_and_deletes(db):
+    ids = [
+        api._create_transaction(db, _transaction(*row)).id
+        for row in [
+            (date(2023, 12, 31), "Food", 10.0),
+            (date(2024, 1, 1), "Food", 2.5),
+            (date(2024, 1, 31), "Rent", 700.0),
+            (date(2024, 2, 1), "Salary", 3000.0, "income"),
+            (date(2024, 2, 1), "Food", 4.25),
+        ]
+    ]
+    _assert_rollups_match(db)
+
+    # Moves to another day, month and category
+    api._update_transaction(db, ids[1], _transaction(date(2024, 2, 5), "Fun", 9.0))
+    _assert_rollups_match(db)
+
+    api._delete_transaction(db, ids[2])
+    api._delete_transaction(db, ids[4])
+    _assert_rollups_match(db)
+    # Buckets left empty are dropped
+    assert db.execute(select(func.min(Rollup.count))).scalar() > 0
+
+
+def test_rebuild_marks_every_month_changed(db):
+    api._create_transaction(db, _transaction(date(2024, 1, 10), "Food", 1.0))
+    api._create_transaction(db, _transaction(date(2024, 3, 10), "Food", 2.0))
+    db.commit()
+    before = current_data_version(db)
+
+    rebuild_rollups(db)
+    db.commit()
+
+    after = current_data_version(db)
+    assert after > before
+    changed = db.execute(
+        select(ChangedMonth.month).where(ChangedMonth.version == after)
+    ).scalars()
+    assert sorted(changed) == ["2024-01", "2024-03"]
+    _assert_rollups_match(db)
@@ -0,0 +1,90 @@
+from datetime import date
+
+from src.dashborges import api
+from src.dashborges.database import Transaction
+from src.dashborges.local_store import LocalStore
+
+
+def _data(category="Food", amount=1.0):
+    return {
+        "date": "2024-01-01",
+        "category": category,
+        "description": "",
+        "amount": amount,
+        "type": "expense",
+    }
+
+
+def _sync(db, *operations):
+    return api.sync_transactions(list(operations), db)["results"]
+
+
+def test_replayed_key_returns_the_original_result(db):
+    create = {"key": "a", "op": "create", "data": _data()}
+    [first] = _sync(db, create)
+    [again] = _sync(db, create)
+
+    assert first["status"] == again["status"] == "applied"
+    assert again["id"] == first["id"]
+    assert db.query(Transaction).count() == 1
+
+    # A replayed create carries the local row's latest values
+    [edited] = _sync(db, {**create, "data": _data(amount=5.0)})
+    assert edited["id"] == first["id"]
+    assert db.query(Transaction).count() == 1
+    assert db.get(Transaction, first["id"]).amount == 5.0
+
+
+def test_changes_to_missing_rows(db):
+    [created] = _sync(db, {"key": "a", "op": "create", "data": _data()})
+    results = _sync(
+        db,
+        {"key": "b", "op": "update", "id": 999, "data": _data()},
+        {"key": "c", "op": "delete", "id": created["id"]},
+        {"key": "d", "op": "delete", "id": 999},
+        # Replaying the create of a row deleted since then
+        {"key": "a", "op": "create", "data": _data(amount=2.0)},
+        {"key": "e", "op": "update", "id": 1},
+    )
+
+    assert [result["status"] for result in results] == [
+        "conflict",
+        "applied",
+        "applied",  # Already gone, which is what was asked
+        "conflict",
+        "invalid",
+    ]
+    assert db.query(Transaction).count() == 0
+
+
+def _local_row(amount):
+    return {
+        "date": date(2024, 1, 1),
+        "category": "Food",
+        "description": "",
+        "amount": amount,
+        "type": "expense",
+    }
+
+
+def test_changes_made_during_a_sync_survive_the_acknowledge(tmp_path):
+    store = LocalStore(tmp_path / "local.db")
+    try:
+        local_id = store.add(_local_row(1.0))
+        store.record_update(7, _local_row(2.0))
+        sent = store.pending(10)
+        assert [op["op"] for op in sent] == ["create", "update"]
+
+        store.update(local_id, _local_row(3.0))
+        store.record_update(7, _local_row(4.0))
+        store.acknowledge(sent)
+
+        pending = store.pending(10)
+        assert pending[0]["key"] == sent[0]["key"]
+        assert [op["data"]["amount"] for op in pending] == [3.0, 4.0]
+        assert pending[1]["key"] != sent[1]["key"]
+
+        store.acknowledge(pending)
+        assert store.pending_count() == 0
+    finally:
+        store.close()
@@ -0,0 +1,78 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.dashborges.write_queue import GroupCommitWriter
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "queue.db"
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+        connection.exec_driver_sql(
+            "CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL)"
+        )
+    yield path, sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _count(path):
+    """Rows visible to a connection outside the writer."""
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT count(*) FROM items").fetchone()[0]
+
+
+def _insert(db, name):
+    db.execute(text("INSERT INTO items (name) VALUES (:name)"), {"name": name})
+    return name
+
+
+def _fail(db):
+    db.execute(text("INSERT INTO items (name) VALUES ('failed')"))
+    raise ValueError("rejected")
+
+
+def test_batch_is_invisible_until_the_group_commits(database):
+    path, session_factory = database
+    writer = GroupCommitWriter(session_factory, window=5, max_batch=4)
+    seen = []
+    try:
+        futures = [
+            writer.submit(_insert, "a"),
+            writer.submit(_insert, "b"),
+            writer.submit(lambda db: seen.append(_count(path))),
+            writer.submit(_insert, "c"),
+        ]
+        assert [future.result(timeout=10) for future in futures] == [
+            "a",
+            "b",
+            None,
+            "c",
+        ]
+    finally:
+        writer.close()
+
+    # Released savepoints of the first two mutations weren't committed yet
+    assert seen == [0]
+    assert _count(path) == 3
+
+
+def test_failed_mutation_is_rolled_back_alone(database):
+    path, session_factory = database
+    writer = GroupCommitWriter(session_factory, window=5, max_batch=3)
+    try:
+        first = writer.submit(_insert, "a")
+        failing = writer.submit(_fail)
+        last = writer.submit(_insert, "b")
+        assert first.result(timeout=10) == "a"
+        with pytest.raises(ValueError):
+            failing.result(timeout=10)
+        assert last.result(timeout=10) == "b"
+    finally:
+        writer.close()
+
+    assert _count(path) == 2